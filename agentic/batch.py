@@ -0,0 +1,115 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from agentic.cache import precomputed_recommendations
+from agentic.pipeline import recommend
+from catalog import get_catalog
+from graph_store import get_graph_store
+from tracing import tracer
+
+
+# Worker processes for the batch job
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", min(8, os.cpu_count() or 1)))
+
+
+def list_users() -> list:
+    """Every user id in the graph."""
+    return get_graph_store().list_users()
+
+
+def recommend_user(user_id: str) -> dict:
+    """
+    Compute one user's recommendation into the precomputed recommendations store. Runs in a
+    worker process, which opens its own store and cache connections on first use.
+
+    Returns:
+        dict: Timing and outcome for the user; failures are reported rather than raised.
+    """
+    start = time.perf_counter()
+    try:
+        with tracer.trace("batch.recommend", user_id=user_id):
+            profile = get_graph_store().get_user_profile(user_id)
+            recommendation = recommend(profile, get_catalog(), progress=lambda message: None)
+            if recommendation.questions:
+                precomputed_recommendations.put(
+                    profile, recommendation.strategy, recommendation.questions, recommendation.fast_path
+                )
+        return {
+            "user_id": user_id,
+            "ok": True,
+            "strategy": recommendation.strategy,
+            "cached": recommendation.cached,
+            "questions": len((recommendation.questions or {}).get("questions", [])),
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+    except Exception as e:
+        return {
+            "user_id": user_id,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+
+def run_batch(user_ids: list = None, workers: int = BATCH_WORKERS) -> dict:
+    """
+    Precompute recommendations for many users in parallel so the app can serve them without running the crews.
+
+    Args:
+        user_ids (list): Users to process; defaults to every user in the graph.
+        workers (int): Number of worker processes.
+
+    Returns:
+        dict: Summary counts plus one result per user, in completion order.
+    """
+    if user_ids is None:
+        user_ids = list_users()
+
+    start = time.perf_counter()
+    results = []
+    # spawn, so workers never inherit the parent's driver or SQLite connections
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(recommend_user, user_id): user_id for user_id in user_ids}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died
+                result = {"user_id": futures[future], "ok": False, "error": f"{type(e).__name__}: {e}", "seconds": None}
+            results.append(result)
+            if result["ok"]:
+                print(f"[✓] {result['user_id']}: {result['strategy']}, {result['questions']} questions "
+                      f"in {result['seconds']}s{' (cached)' if result['cached'] else ''}")
+            else:
+                print(f"[x] {result['user_id']}: {result['error']}")
+
+    failed = [r["user_id"] for r in results if not r["ok"]]
+    summary = {
+        "users": len(user_ids),
+        "succeeded": len(results) - len(failed),
+        "failed": failed,
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 3),
+        "results": results
+    }
+    print(f"Recommended for {summary['succeeded']}/{summary['users']} users in {summary['seconds']}s "
+          f"with {workers} workers")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute recommendations for every user.")
+    parser.add_argument("--users", nargs="+", help="only these user ids")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--report", help="write the per-user results as JSON to this file")
+    args = parser.parse_args()
+
+    summary = run_batch(args.users, args.workers)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2)
+    raise SystemExit(1 if summary["failed"] else 0)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+from agentic.models import Questions, UserProfile
+from kvcache import CACHE_DIR, SQLiteCache
+
+
+RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", 6 * 60 * 60))
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", 1000))
+RECOMMENDATION_CACHE_PATH = os.getenv(
+    "RECOMMENDATION_CACHE_PATH", os.path.join(CACHE_DIR, "recommendations.sqlite3")
+)
+
+
+class RecommendationCache:
+    """
+    Content-addressed cache of recommendation results.
+
+    Entries are keyed by a hash of the user's stats snapshot, the chosen strategy and the
+    version of the user's recommendation history, so identical inputs skip the crews entirely
+    while a newly recorded recommendation makes the next request re-score with its recency penalty. Entries are tagged with the user id so that
+    logging a new interaction can drop everything cached for that user.
+    """
+
+    def __init__(self, cache: SQLiteCache = None):
+        self.cache = cache if cache is not None else SQLiteCache(
+            RECOMMENDATION_CACHE_PATH,
+            table="recommendations",
+            ttl=RECOMMENDATION_CACHE_TTL,
+            max_entries=RECOMMENDATION_CACHE_MAX_ENTRIES
+        )
+
+
+    @staticmethod
+    def key(profile: UserProfile, strategy: str, history_version: float = None) -> str:
+        """Stable hash of everything the recommendation depends on."""
+        payload = {
+            "user_id": profile.user_id,
+            "topic_stats": profile.topic_stats,
+            "difficulty_stats": profile.difficulty_stats,
+            "solved": sorted(profile.solved),
+            "strategy": strategy
+        }
+        if history_version is not None:
+            payload["history_version"] = history_version
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+    def get(self, profile: UserProfile, strategy: str, history_version: float = None):
+        """
+        The cached recommendation as a {"questions": [...]} dict, or None.
+
+        Args:
+            history_version (float): `RecommendationHistory.version` of the user, so results
+                cached before the user's last recommendation are not served again.
+        """
+        entry = self.cache.get(self.key(profile, strategy, history_version))
+        return entry.value if entry is not None else None
+
+
+    def put(self, profile: UserProfile, strategy: str, result, history_version: float = None) -> dict:
+        """Validate a crew result against `Questions` and cache it."""
+        if hasattr(result, "to_dict"):
+            result = result.to_dict()
+        questions = Questions.model_validate(result).model_dump()
+        self.cache.set(self.key(profile, strategy, history_version), questions, tag=profile.user_id)
+        return questions
+
+
+    def get_strategy(self, profile: UserProfile):
+        """The strategy the selector crew chose for this exact snapshot, or None."""
+        entry = self.cache.get(self.key(profile, "strategy"))
+        return entry.value if entry is not None else None
+
+
+    def put_strategy(self, profile: UserProfile, strategy: str):
+        """Remember a crew-chosen strategy so the snapshot never needs the crew again."""
+        self.cache.set(self.key(profile, "strategy"), strategy, tag=profile.user_id)
+
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached recommendation for a user."""
+        return self.cache.invalidate(tag=user_id)
+
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+def profile_version(profile: UserProfile) -> str:
+    """Hash of the stats snapshot alone, identifying which profile a recommendation was made from."""
+    return RecommendationCache.key(profile, None)
+
+
+class PrecomputedRecommendations:
+    """
+    Durable store of the recommendations the batch job computes ahead of time.
+
+    One entry per user, replaced on every batch run and tagged with the profile version it was
+    computed from; it is served only while the user's stats still match. Entries never expire
+    and are never evicted, since the store is bounded by the number of users and a nightly
+    run must not lose its own early results or go stale before users arrive.
+    """
+
+    def __init__(self, cache: SQLiteCache = None):
+        self.cache = cache if cache is not None else SQLiteCache(
+            RECOMMENDATION_CACHE_PATH, table="precomputed_recommendations"
+        )
+
+
+    def get(self, profile: UserProfile):
+        """The precomputed {"strategy", "questions", "fast_path"} for this exact profile, or None."""
+        entry = self.cache.get(profile.user_id)
+        if entry is None or entry.meta.get("version") != profile_version(profile):
+            return None
+        return entry.value
+
+
+    def put(self, profile: UserProfile, strategy: str, questions: dict, fast_path: bool):
+        self.cache.set(
+            profile.user_id,
+            {"strategy": strategy, "questions": questions, "fast_path": fast_path},
+            meta={"version": profile_version(profile)}
+        )
+
+
+    def invalidate_user(self, user_id: str) -> int:
+        return self.cache.invalidate(key=user_id)
+
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+# Global, reusable caches
+recommendation_cache = RecommendationCache()
+precomputed_recommendations = PrecomputedRecommendations()
@@ -0,0 +1,181 @@
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from agentic.tools import score_exploration_topics, score_weak_topics
+from catalog import DIFFICULTIES
+from graph_store import get_graph_store
+from kvcache import CACHE_DIR
+from tracing import tracer
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# Most candidates the local prefilter hands to the question finder
+CANDIDATE_LIMIT = int(os.getenv("CANDIDATE_LIMIT", 300))
+# Token budget for the unsolved-questions knowledge file
+KNOWLEDGE_TOKEN_BUDGET = int(os.getenv("KNOWLEDGE_TOKEN_BUDGET", 6000))
+# How many weak / least explored topics the prefilter targets
+TARGET_TOPICS = int(os.getenv("CANDIDATE_TARGET_TOPICS", 5))
+TOKEN_LOG_PATH = os.getenv("TOKEN_LOG_PATH", os.path.join(CACHE_DIR, "token_usage.jsonl"))
+
+CANDIDATE_COLUMNS = ["slug", "topics", "difficulty"]
+
+
+def count_tokens(text: str) -> int:
+    """Token count under the gpt-4o encoding, or a 4-characters-per-token estimate without tiktoken."""
+    if tiktoken is not None:
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    return -(-len(text) // 4)
+
+
+def target_topics(performance_analysis: dict, strategy: str, top_k: int = TARGET_TOPICS) -> list:
+    """
+    The topics the recommendation should cover: the weakest attempted topics for "improve",
+    the least explored topics for "exploration".
+    """
+    if strategy == "improve":
+        attempted = {
+            topic: metrics for topic, metrics in performance_analysis.items()
+            if metrics.get("count", 0) > 0
+        }
+        return [t["topic"] for t in score_weak_topics(attempted, top_k=top_k)]
+    return [t["topic"] for t in score_exploration_topics(performance_analysis, top_k=top_k)]
+
+
+def prefilter_candidates(catalog, profile, topics: list, limit: int = CANDIDATE_LIMIT, store=None) -> np.ndarray:
+    """
+    Catalog rows of the unsolved questions sharing the most topics with `topics`, best first.
+
+    Once the catalog has been loaded into the graph store (`catalog_loader.py`, or
+    `load_catalog()` for SQLite), the anti-join runs there; otherwise against the in-memory
+    catalog, in the same order. Questions the local catalog doesn't have are left out.
+    Falls back to the first `limit` unsolved questions when there are no target topics,
+    e.g. for a user with no attempts yet.
+
+    Args:
+        store (GraphStore): Where the user's interactions live; defaults to `get_graph_store()`.
+    """
+    if topics:
+        store = store or get_graph_store()
+        if store.catalog_loaded():
+            candidates = store.get_unsolved_candidates(profile.user_id, topics, limit=limit)
+            return catalog.index_of([candidate["slug"] for candidate in candidates])
+        rows, _ = catalog.top_k(topics, k=limit, exclude=profile.solved)
+        return rows
+    return catalog.select(exclude=profile.solved)[:limit]
+
+
+def compact_frame(catalog, rows) -> pd.DataFrame:
+    """The `slug,topics,difficulty` projection of catalog rows, topics joined with "|"."""
+    return pd.DataFrame({
+        "slug": [catalog.slugs[row] for row in rows],
+        "topics": ["|".join(catalog.topics_of(row)) for row in rows],
+        "difficulty": [DIFFICULTIES[catalog.difficulty[row]] for row in rows]
+    }, columns=CANDIDATE_COLUMNS)
+
+
+def fit_to_budget(df: pd.DataFrame, budget: int = KNOWLEDGE_TOKEN_BUDGET) -> pd.DataFrame:
+    """Keep the longest prefix of `df` whose CSV rendering fits in `budget` tokens."""
+    header = count_tokens(",".join(df.columns) + "\n")
+    row_tokens = np.fromiter(
+        (count_tokens(line) for line in df.to_csv(index=False, header=False).splitlines(keepends=True)),
+        dtype=np.int64, count=len(df)
+    )
+    fits = int(np.searchsorted(np.cumsum(row_tokens), budget - header, side="right"))
+    return df.iloc[:fits]
+
+
+def candidate_questions(catalog, profile, performance_analysis: dict, strategy: str,
+                        limit: int = CANDIDATE_LIMIT, budget: int = KNOWLEDGE_TOKEN_BUDGET, store=None) -> pd.DataFrame:
+    """
+    The compact candidate set written as the question finder's knowledge source.
+
+    Args:
+        catalog (QuestionCatalog): The question catalog.
+        profile (UserProfile): The user's stats snapshot; solved questions are left out.
+        performance_analysis (dict): Output from `analyse_topic_performance`.
+        strategy (str): "improve" or "exploration".
+        limit (int): Most candidates to consider.
+        budget (int): Token budget for the rendered CSV.
+        store (GraphStore): Passed on to `prefilter_candidates`.
+
+    Returns:
+        pd.DataFrame: `slug,topics,difficulty` rows, most relevant first.
+    """
+    topics = target_topics(performance_analysis, strategy)
+    df = fit_to_budget(compact_frame(catalog, prefilter_candidates(catalog, profile, topics, limit, store)), budget)
+    print(f"candidates for {profile.user_id}: {len(df)} questions targeting {topics}")
+    return df
+
+
+class TokenRecorder:
+    """
+    Crew task callback that records the prompt and completion tokens spent on each task.
+
+    Usage is read from the crew's running totals after every task, so each record is the
+    delta since the previous one. The current kickoff's records are kept in `records`, which
+    `start()` clears since pooled crews reuse their recorder, and every record is appended to
+    TOKEN_LOG_PATH. Each task is traced as a "crew.task" span covering the time since `start()`
+    or the previous task (mostly LLM latency) with its token counts.
+
+    Args:
+        user_id (str): User the crew is running for.
+        callback (callable): Task callback to forward each TaskOutput to, e.g. a UI hook.
+        path (str): JSONL file to append records to; None disables the log.
+    """
+
+    def __init__(self, user_id: str, callback=None, path: str = TOKEN_LOG_PATH):
+        self.user_id = user_id
+        self.callback = callback
+        self.path = path
+        self.crew = None
+        self.records = []
+        self._seen = {"prompt_tokens": 0, "completion_tokens": 0}
+        self._task_started = time.perf_counter()
+
+
+    def bind(self, crew):
+        self.crew = crew
+        return crew
+
+
+    def start(self):
+        """Mark the start of a kickoff, for timing its first task, and drop the previous kickoff's records."""
+        self.records = []
+        self._task_started = time.perf_counter()
+
+
+    def __call__(self, output):
+        if self.crew is not None:
+            usage = self.crew.calculate_usage_metrics()
+            record = {
+                "user_id": self.user_id,
+                "task": getattr(output, "name", None) or output.description[:60],
+                "agent": output.agent,
+                "prompt_tokens": usage.prompt_tokens - self._seen["prompt_tokens"],
+                "completion_tokens": usage.completion_tokens - self._seen["completion_tokens"],
+                "timestamp": time.time()
+            }
+            self._seen = {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+            self.records.append(record)
+
+            now = time.perf_counter()
+            tracer.record(
+                "crew.task", record["agent"], now - self._task_started, task=record["task"],
+                prompt_tokens=record["prompt_tokens"], completion_tokens=record["completion_tokens"]
+            )
+            self._task_started = now
+            print(f"tokens: {record['agent']} prompt={record['prompt_tokens']} completion={record['completion_tokens']}")
+
+            if self.path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+
+        if self.callback is not None:
+            self.callback(output)
@@ -0,0 +1,127 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from tracing import tracer
+
+
+# Most (crew class, user) pairs kept warm at once
+MAX_POOLED_CREWS = int(os.getenv("MAX_POOLED_CREWS", 64))
+
+
+def refresh_knowledge(crew):
+    """
+    Re-read the files behind every agent's knowledge sources.
+
+    File-backed sources load their content when they are constructed, and the knowledge
+    files are rewritten for each request, so a reused agent gets fresh copies of its
+    sources. Embeddings of unchanged chunks come from the embedding cache.
+    """
+    for agent in crew.agents:
+        if agent.knowledge_sources:
+            agent.knowledge_sources = [
+                type(source)(file_paths=source.file_paths) for source in agent.knowledge_sources
+            ]
+
+
+class _PooledCrew:
+    def __init__(self, crew_base):
+        self.crew_base = crew_base
+        self.crew = crew_base.crew()
+        self.lock = threading.Lock()
+        self.uses = 0
+
+
+class CrewFactory:
+    """
+    Process-level pool of built crews, one per (crew class, user id).
+
+    A crew's agents, LLM clients, tools and `memory=True` stores are built once and reused
+    by later requests. Each request borrows the crew exclusively through `lease()`, which
+    attaches that request's callbacks and refreshes file-backed knowledge. Per-request
+    inputs go to `kickoff(inputs=...)`.
+    """
+
+    def __init__(self, max_crews: int = MAX_POOLED_CREWS):
+        self.max_crews = max_crews
+        self._pool = OrderedDict()
+        self._lock = threading.Lock()
+        self.built = 0
+        self.reused = 0
+
+
+    def _get(self, crew_class, user_id: str, **kwargs) -> _PooledCrew:
+        key = (crew_class.__name__, user_id)
+        with self._lock:
+            pooled = self._pool.get(key)
+            if pooled is not None:
+                self._pool.move_to_end(key)
+                self.reused += 1
+                return pooled
+
+        built = _PooledCrew(crew_class(user_id=user_id, **kwargs))
+        with self._lock:
+            # Another request may have built the same crew meanwhile; keep the first one
+            pooled = self._pool.setdefault(key, built)
+            self._pool.move_to_end(key)
+            self.built += pooled is built
+            while len(self._pool) > self.max_crews:
+                self._pool.popitem(last=False)
+        return pooled
+
+
+    @contextmanager
+    def lease(self, crew_class, user_id: str, task_callback=None, step_callback=None, profile=None, **kwargs):
+        """
+        Borrow the pooled crew for a user, building it on first use.
+
+        Args:
+            crew_class: A @CrewBase class taking `user_id` (e.g. `ExploreCrew`).
+            user_id (str): The user the crew runs for; crews and their memory are never shared between users.
+            task_callback / step_callback: Callbacks for this request only.
+            profile (UserProfile): This request's user snapshot, passed to the crew's `bind_profile`
+                if it has one (e.g. the solved questions `ExploreCrew`'s tool excludes).
+            **kwargs: Extra constructor arguments, used only when the crew is first built.
+
+        Yields:
+            Crew: The warm crew, ready for `kickoff()`.
+        """
+        pooled = self._get(crew_class, user_id, **kwargs)
+        with pooled.lock:
+            if pooled.uses:
+                refresh_knowledge(pooled.crew)
+            pooled.uses += 1
+            self._attach(pooled, task_callback, step_callback)
+            if profile is not None and hasattr(pooled.crew_base, "bind_profile"):
+                pooled.crew_base.bind_profile(profile)
+            try:
+                with tracer.span("crew", crew_class.__name__, user_id=user_id, warm=pooled.uses > 1):
+                    pooled.crew_base.tokens.start()
+                    yield pooled.crew
+            finally:
+                self._attach(pooled, None, None)
+
+
+    @staticmethod
+    def _attach(pooled: _PooledCrew, task_callback, step_callback):
+        pooled.crew_base.tokens.callback = task_callback
+        pooled.crew.step_callback = step_callback
+        # Agents keep the step callback the crew gave them on their first kickoff
+        for agent in pooled.crew.agents:
+            agent.step_callback = step_callback
+
+
+    def clear(self, user_id: str = None):
+        """Drop pooled crews for one user, or all of them."""
+        with self._lock:
+            for key in [key for key in self._pool if user_id is None or key[1] == user_id]:
+                del self._pool[key]
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pooled": len(self._pool), "built": self.built, "reused": self.reused}
+
+
+# Global, reusable crew pool
+crew_factory = CrewFactory()
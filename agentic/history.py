@@ -0,0 +1,204 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from kvcache import CACHE_DIR
+
+
+HISTORY_PATH = os.getenv("RECOMMENDATION_HISTORY_PATH", os.path.join(CACHE_DIR, "recommendation_history.sqlite3"))
+# Entries not recommended again within this many days are aged out
+HISTORY_MAX_AGE_DAYS = float(os.getenv("RECOMMENDATION_HISTORY_MAX_AGE_DAYS", 90))
+
+
+class RecommendationHistory:
+    """
+    Per-user record of which questions were recommended, how often and when last.
+
+    Each (user_id, slug) pair is one row, updated with an atomic upsert so concurrent
+    sessions for the same user never lose each other's counts. Rows are aged out once they
+    haven't been recommended for `max_age_days`.
+
+    Args:
+        path (str): SQLite file the history lives in (":memory:" for a process-local store).
+        max_age_days (float): Age at which entries are pruned; None keeps them forever.
+    """
+
+    def __init__(self, path: str = HISTORY_PATH, max_age_days: float = HISTORY_MAX_AGE_DAYS):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS recommendation_history (
+                user_id TEXT NOT NULL,
+                slug TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                first_recommended_at REAL NOT NULL,
+                last_recommended_at REAL NOT NULL,
+                PRIMARY KEY (user_id, slug)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS recommendation_history_user_last "
+            "ON recommendation_history (user_id, last_recommended_at)"
+        )
+
+
+    def record(self, user_id: str, slugs: list, recommended_at: float = None) -> int:
+        """
+        Count one more recommendation of each slug for a user, in a single transaction.
+
+        Returns:
+            int: Number of entries aged out for the user while recording.
+        """
+        now = time.time() if recommended_at is None else recommended_at
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO recommendation_history
+                        (user_id, slug, count, first_recommended_at, last_recommended_at)
+                    VALUES (?, ?, 1, ?, ?)
+                    ON CONFLICT (user_id, slug) DO UPDATE SET
+                        count = count + 1,
+                        last_recommended_at = MAX(last_recommended_at, excluded.last_recommended_at)
+                    """,
+                    [(user_id, slug, now, now) for slug in dict.fromkeys(slugs)]
+                )
+                pruned = self._prune(user_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return pruned
+
+
+    def _prune(self, user_id: str = None) -> int:
+        if self.max_age_days is None:
+            return 0
+        cutoff = time.time() - self.max_age_days * 86400
+        if user_id is None:
+            cursor = self._conn.execute(
+                "DELETE FROM recommendation_history WHERE last_recommended_at < ?", (cutoff,)
+            )
+        else:
+            cursor = self._conn.execute(
+                "DELETE FROM recommendation_history WHERE user_id = ? AND last_recommended_at < ?",
+                (user_id, cutoff)
+            )
+        return cursor.rowcount
+
+
+    def prune(self, user_id: str = None) -> int:
+        """Age out old entries for one user, or for everyone."""
+        with self._lock:
+            return self._prune(user_id)
+
+
+    def version(self, user_id: str) -> float:
+        """When the user was last recommended anything (0 if never); changes on every `record`."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(last_recommended_at) FROM recommendation_history WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] or 0.0
+
+
+    def get(self, user_id: str, slugs: list = None) -> dict:
+        """
+        A user's history in the past-recommendations shape the scorer reads.
+
+        Args:
+            user_id (str): The user to look up.
+            slugs (list): Only return these slugs; defaults to the user's whole history.
+
+        Returns:
+            dict: slug -> {"timestamp": ISO time last recommended, "count": times recommended}.
+        """
+        with self._lock:
+            if slugs is None:
+                rows = self._conn.execute(
+                    "SELECT slug, count, last_recommended_at FROM recommendation_history WHERE user_id = ?",
+                    (user_id,)
+                ).fetchall()
+            else:
+                rows = []
+                slugs = list(slugs)
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(slugs), 500):
+                    chunk = slugs[start:start + 500]
+                    rows += self._conn.execute(
+                        "SELECT slug, count, last_recommended_at FROM recommendation_history "
+                        f"WHERE user_id = ? AND slug IN ({','.join('?' * len(chunk))})",
+                        (user_id, *chunk)
+                    ).fetchall()
+
+        return {
+            slug: {"timestamp": datetime.fromtimestamp(last).isoformat(), "count": count}
+            for slug, count, last in rows
+        }
+
+
+    def import_json(self, user_id: str, path: str) -> int:
+        """
+        Merge a legacy `{user}_past_recommendations.json` file into the store and rename it
+        to `<path>.imported` so it is only imported once.
+
+        Returns:
+            int: Number of entries imported.
+        """
+        with open(path) as f:
+            try:
+                past_recommendations = json.load(f)
+            except json.JSONDecodeError:
+                past_recommendations = {}
+
+        rows = []
+        for slug, past in past_recommendations.items():
+            timestamp = past["timestamp"]
+            # Older files hold the timestamp JSON-encoded a second time
+            if isinstance(timestamp, str) and timestamp.startswith('"'):
+                timestamp = json.loads(timestamp)
+            recommended_at = datetime.fromisoformat(timestamp).timestamp()
+            rows.append((user_id, slug, past.get("count", 1), recommended_at, recommended_at))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO recommendation_history
+                        (user_id, slug, count, first_recommended_at, last_recommended_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, slug) DO UPDATE SET
+                        count = count + excluded.count,
+                        first_recommended_at = MIN(first_recommended_at, excluded.first_recommended_at),
+                        last_recommended_at = MAX(last_recommended_at, excluded.last_recommended_at)
+                    """,
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        os.replace(path, f"{path}.imported")
+        print(f"imported {len(rows)} past recommendations for {user_id} from {path}")
+        return len(rows)
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Global, reusable history store
+recommendation_history = RecommendationHistory()
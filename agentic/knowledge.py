@@ -0,0 +1,76 @@
+import hashlib
+import os
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions.openai_embedding_function import OpenAIEmbeddingFunction
+from kvcache import CACHE_DIR, SQLiteCache
+
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 50000))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CACHE_DIR, "embeddings.sqlite3"))
+
+
+def _dumps(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _loads(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    Embedding function that content-hashes every chunk and only embeds chunks it hasn't seen.
+
+    Vectors are kept in an on-disk LRU store keyed by model and SHA-256 of the chunk text,
+    so re-adding unchanged knowledge files costs no embedding calls.
+    """
+
+    def __init__(self, embedder: EmbeddingFunction = None, cache: SQLiteCache = None,
+                 model: str = EMBEDDING_MODEL):
+        self.model = model
+        self.embedder = embedder if embedder is not None else OpenAIEmbeddingFunction(
+            api_key=os.getenv("OPENAI_API_KEY"), model_name=model
+        )
+        self.cache = cache if cache is not None else SQLiteCache(
+            EMBEDDING_CACHE_PATH,
+            table="embeddings",
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+            dumps=_dumps,
+            loads=_loads
+        )
+
+
+    def key(self, text: str) -> str:
+        return f"{self.model}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [self.key(text) for text in input]
+        vectors = []
+        missing = []
+        for i, key in enumerate(keys):
+            entry = self.cache.get(key)
+            vectors.append(entry.value if entry is not None else None)
+            if entry is None:
+                missing.append(i)
+
+        if missing:
+            embedded = self.embedder([input[i] for i in missing])
+            for i, vector in zip(missing, embedded):
+                self.cache.set(keys[i], vector)
+                vectors[i] = np.asarray(vector, dtype=np.float32)
+
+        return [vector.tolist() for vector in vectors]
+
+
+_embedding_function = None
+
+
+def knowledge_embedder() -> dict:
+    """crewai embedder config backed by the process-wide cached embedding function."""
+    global _embedding_function
+    if _embedding_function is None:
+        _embedding_function = CachedEmbeddingFunction()
+    return {"provider": "custom", "config": {"embedder": _embedding_function}}
@@ -1,11 +1,6 @@
 import pandas as pd
 from pydantic import BaseModel, ConfigDict
-from typing import List
-
-class DataFrameWrapper(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
-    df: pd.DataFrame
+from typing import Any, Dict, List
 
 class Question(BaseModel):
     slug: str
@@ -14,4 +9,19 @@ class Question(BaseModel):
 
 
 class Questions(BaseModel):
-    questions: List[Question]
\ No newline at end of file
+    questions: List[Question]
+
+
+class UserProfile(BaseModel):
+    """Snapshot of everything the recommendation path needs to know about a user."""
+    model_config = ConfigDict(frozen=True)
+
+    user_id: str
+    topic_stats: Dict[str, Dict[str, int]]
+    difficulty_stats: Dict[str, Dict[str, int]]
+    recently_solved: Dict[str, Dict[str, Any]]
+    solved: List[str]
+
+    def unsolved_questions(self, catalog) -> pd.DataFrame:
+        """Rows of the `QuestionCatalog` the user hasn't solved yet."""
+        return catalog.to_frame(catalog.select(exclude=self.solved))
@@ -0,0 +1,159 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from agentic.cache import precomputed_recommendations, recommendation_cache
+from agentic.candidates import candidate_questions, prefilter_candidates, target_topics
+from agentic.crew import ExploreCrew, RerankCrew, StrategySelectorCrew
+from agentic.factory import crew_factory
+from agentic.history import recommendation_history
+from agentic.scoring import (
+    LLM_RERANK,
+    RECOMMENDATION_COUNT,
+    RERANK_TOP_N,
+    comfort_level,
+    score_candidates,
+    top_questions
+)
+from agentic.strategy import parse_strategy, select_strategy
+from catalog import DIFFICULTIES
+from tracing import tracer
+from utils import analyse_topic_performance, save_knowledge
+
+
+@dataclass
+class Recommendation:
+    user_id: str
+    strategy: str
+    questions: dict          # {"questions": [...]}, validated against `Questions`
+    cached: bool
+    fast_path: bool
+
+
+def import_legacy_history(user_id: str):
+    """Merge the user's old past-recommendations JSON file into the history store, if there is one."""
+    path = os.path.join(os.getcwd(), f"knowledge/{user_id}_past_recommendations.json")
+    if os.path.exists(path):
+        recommendation_history.import_json(user_id, path)
+
+
+@tracer.traced("stage", counts=False)
+def recommend_improve(catalog, profile, performance_analysis: dict, task_callback=None, step_callback=None,
+                      factory=crew_factory, store=None):
+    """
+    Score the user's weak-topic candidates locally and, if LLM_RERANK is set, let
+    RerankCrew re-order only the top RERANK_TOP_N of them.
+    """
+    topics = target_topics(performance_analysis, "improve")
+    candidates = prefilter_candidates(catalog, profile, topics, store=store)
+    rows, scores = score_candidates(
+        catalog,
+        candidates,
+        performance_analysis,
+        profile.difficulty_stats,
+        recommendation_history.get(profile.user_id, [catalog.slugs[row] for row in candidates])
+    )
+    if not LLM_RERANK:
+        return {"questions": top_questions(catalog, rows, scores, RECOMMENDATION_COUNT)}
+
+    with factory.lease(RerankCrew, profile.user_id, task_callback, step_callback) as crew:
+        return crew.kickoff(inputs={
+            "candidates": json.dumps(top_questions(catalog, rows, scores, RERANK_TOP_N), indent=2),
+            "weak_topics": ", ".join(topics),
+            "max_difficulty": DIFFICULTIES[comfort_level(profile.difficulty_stats)],
+            "count": RECOMMENDATION_COUNT
+        })
+
+
+def recommend(profile, catalog, progress=print, task_callback=None, step_callback=None,
+              factory=crew_factory, store=None) -> Recommendation:
+    """
+    Pick a strategy for the user and produce their recommendation, reusing the batch job's
+    precomputed result or a cached one when the user's stats haven't changed since.
+
+    Knowledge files are only written for the crews that read them, concurrently, and are
+    removed once the recommendation is made. Recording what was shown in the history store
+    is left to the caller.
+
+    Args:
+        profile (UserProfile): The user's stats snapshot.
+        catalog (QuestionCatalog): The question catalog.
+        progress (callable): Receives a short message at each stage, e.g. `st.status(...).write`.
+        task_callback / step_callback: Forwarded to any crew that runs.
+        factory (CrewFactory): Where crews are leased from; benchmarks pass a stub.
+        store (GraphStore): Queried for candidates once it holds the catalog; defaults to `get_graph_store()`.
+
+    Returns:
+        Recommendation: The strategy used and the recommended questions.
+    """
+    user_id = profile.user_id
+    precomputed = precomputed_recommendations.get(profile)
+    if precomputed is not None:
+        print(f"serving precomputed recommendation for {user_id}")
+        progress("Found a precomputed recommendation for these exact stats")
+        return Recommendation(
+            user_id, precomputed["strategy"], precomputed["questions"], cached=True, fast_path=precomputed["fast_path"]
+        )
+
+    performance_analysis = analyse_topic_performance(profile.topic_stats)
+    knowledge_paths = []
+    # Bound to the caller's trace, since the writes run on pool threads
+    save = tracer.wrap(save_knowledge)
+
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            knowledge_futures = [
+                executor.submit(save, user_id, performance_analysis, "topic_stats", "json"),
+                executor.submit(save, user_id, profile.recently_solved, "recently_solved", "json")
+            ]
+
+            decision = select_strategy(performance_analysis, profile.recently_solved)
+            strategy = decision.strategy or recommendation_cache.get_strategy(profile)
+            if strategy is None:
+                # The strategy selector reads the files written above
+                wait(knowledge_futures)
+                progress("Strategy is a close call, asking the strategy selector agent")
+                with factory.lease(StrategySelectorCrew, user_id, task_callback, step_callback) as crew:
+                    answer = crew.kickoff()
+                strategy = parse_strategy(answer)
+                if strategy is None:
+                    # Not cached, so the next request for this snapshot asks the crew again
+                    strategy = decision.leaning
+                    print(f"strategy selector answered {str(answer)!r}, falling back to {strategy}")
+                else:
+                    recommendation_cache.put_strategy(profile, strategy)
+            progress(f"Strategy: {strategy}")
+
+            # Part of the cache key: recording the shown questions changes the recency penalty
+            history_version = recommendation_history.version(user_id)
+            result = recommendation_cache.get(profile, strategy, history_version)
+            if result is None and strategy == "exploration":
+                knowledge_futures.append(executor.submit(
+                    save, user_id,
+                    candidate_questions(catalog, profile, performance_analysis, "exploration", store=store),
+                    "unsolved_questions", "csv"
+                ))
+            knowledge_paths = [future.result() for future in knowledge_futures]
+
+        if result is not None:
+            print(f"serving cached recommendation for {user_id}")
+            progress("Found a recommendation for these exact stats")
+            return Recommendation(user_id, strategy, result, cached=True, fast_path=decision.fast_path)
+
+        if strategy == "improve":
+            import_legacy_history(user_id)
+            progress("Scoring candidates against your weak topics")
+            result = recommend_improve(
+                catalog, profile, performance_analysis, task_callback, step_callback, factory=factory, store=store
+            )
+        elif strategy == "exploration":
+            with factory.lease(ExploreCrew, user_id, task_callback, step_callback, profile=profile) as crew:
+                result = crew.kickoff()
+
+        if result:
+            result = recommendation_cache.put(profile, strategy, result, history_version)
+        return Recommendation(user_id, strategy, result, cached=False, fast_path=decision.fast_path)
+    finally:
+        for path in knowledge_paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,138 @@
+import json
+import os
+from datetime import datetime
+import numpy as np
+from agentic.tools import DEFAULT_WEAKNESS_WEIGHTS
+from catalog import DIFFICULTIES
+
+
+# Weight of each signal in the final score
+SCORING_WEIGHTS = {"topics": 0.6, "difficulty": 0.3, "recency": 0.3, "repeat": 0.1}
+# Solve rate at which a difficulty counts as comfortable
+COMFORT_SOLVE_RATE = float(os.getenv("COMFORT_SOLVE_RATE", 0.5))
+# Days for the "recently recommended" penalty to halve
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("RECENCY_HALF_LIFE_DAYS", 3))
+# Recommendations after which a still-unsolved question gets a final boost
+REPEAT_BOOST_AFTER = int(os.getenv("REPEAT_BOOST_AFTER", 3))
+
+# Questions in a recommendation
+RECOMMENDATION_COUNT = int(os.getenv("RECOMMENDATION_COUNT", 5))
+# Optional LLM re-ranking of the scorer's top candidates
+LLM_RERANK = os.getenv("LLM_RERANK", "false").lower() in ("1", "true", "yes")
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", 10))
+
+
+def topic_weakness(catalog, performance_analysis: dict, weights: dict = None) -> np.ndarray:
+    """
+    Weakness of every catalog topic as a vector indexed like `catalog.topics`, using the
+    `rank_weak_topics` formula. Topics the user hasn't attempted score 0.
+    """
+    if weights is None:
+        weights = DEFAULT_WEAKNESS_WEIGHTS
+
+    weakness = np.zeros(len(catalog.topics))
+    for topic, metrics in performance_analysis.items():
+        if metrics.get("count", 0) > 0 and topic in catalog.topic_index:
+            weakness[catalog.topic_index[topic]] = (
+                weights["accuracy"] * (1 - metrics.get("accuracy", 0) / 100) +
+                weights["hints_usage"] * metrics.get("hints_usage", 0) / 100 +
+                weights["youtube_watch_rate"] * metrics.get("youtube_watch_rate", 0) / 100
+            )
+    return weakness
+
+
+def comfort_level(difficulty_stats: dict, solve_rate: float = COMFORT_SOLVE_RATE) -> int:
+    """
+    Index into DIFFICULTIES of the hardest difficulty the user solves at least `solve_rate` of.
+    Users with no comfortable difficulty yet start at Easy.
+    """
+    comfort = 0
+    for code, difficulty in enumerate(DIFFICULTIES):
+        stats = difficulty_stats.get(difficulty) or {}
+        if stats.get("count", 0) and stats.get("solved", 0) / stats["count"] >= solve_rate:
+            comfort = code
+    return comfort
+
+
+def _recommended_at(timestamp) -> datetime:
+    # Older memory files hold the timestamp JSON-encoded a second time
+    if isinstance(timestamp, str) and timestamp.startswith('"'):
+        timestamp = json.loads(timestamp)
+    return datetime.fromisoformat(timestamp)
+
+
+def score_candidates(catalog, rows, performance_analysis: dict, difficulty_stats: dict,
+                     past_recommendations: dict = None, now: datetime = None,
+                     weights: dict = None) -> tuple:
+    """
+    Score candidate questions on every signal the scoring agent weighs, in one vectorized pass.
+
+    - topics: summed weakness of the question's topics, scaled so the best candidate is 1.
+    - difficulty: 1 at the user's comfort level, 0.25 less per level below it, and -1
+      above it so harder questions sink to the bottom.
+    - recency: minus a penalty halving every RECENCY_HALF_LIFE_DAYS since the last recommendation.
+    - repeat: a boost for questions recommended REPEAT_BOOST_AFTER times or more that are
+      still unsolved, scaled by how long ago they were last shown.
+
+    Args:
+        catalog (QuestionCatalog): The question catalog.
+        rows (np.ndarray): Catalog rows of the candidates, e.g. from `prefilter_candidates`.
+        performance_analysis (dict): Output from `analyse_topic_performance`.
+        difficulty_stats (dict): Attempted/solved counts per difficulty, as in `get_difficulty_stats`.
+        past_recommendations (dict): Slug -> {"timestamp", "count"} history of past recommendations.
+        now (datetime): Reference time for the recency decay; defaults to now.
+        weights (dict): Weight per signal; defaults to SCORING_WEIGHTS.
+
+    Returns:
+        tuple: (rows, scores) sorted by descending score, ties in catalog order.
+    """
+    if weights is None:
+        weights = SCORING_WEIGHTS
+    if now is None:
+        now = datetime.now()
+    rows = np.asarray(rows, dtype=np.intp)
+
+    onehot = np.unpackbits(
+        np.ascontiguousarray(catalog.topic_masks[rows]).view(np.uint8), axis=1, bitorder="little"
+    )[:, :len(catalog.topics)]
+    topic_score = onehot @ topic_weakness(catalog, performance_analysis)
+    if len(rows) and topic_score.max() > 0:
+        topic_score = topic_score / topic_score.max()
+
+    comfort = comfort_level(difficulty_stats)
+    difficulty = catalog.difficulty[rows].astype(np.int64)
+    difficulty_score = np.where(difficulty > comfort, -1.0, 1 - 0.25 * (comfort - difficulty))
+
+    # The history is small, so scatter it into candidate positions rather than look up every candidate
+    position = {row: i for i, row in enumerate(rows.tolist())}
+    age_days = np.full(len(rows), np.inf)
+    counts = np.zeros(len(rows))
+    for slug, past in (past_recommendations or {}).items():
+        i = position.get(catalog.slug_index.get(slug))
+        if i is not None:
+            age_days[i] = (now - _recommended_at(past["timestamp"])).total_seconds() / 86400
+            counts[i] = past.get("count", 1)
+    recency = 0.5 ** (np.maximum(age_days, 0) / RECENCY_HALF_LIFE_DAYS)
+    repeat = (counts >= REPEAT_BOOST_AFTER) * (1 - recency)
+
+    scores = (
+        weights["topics"] * topic_score +
+        weights["difficulty"] * difficulty_score -
+        weights["recency"] * recency +
+        weights["repeat"] * repeat
+    )
+    order = np.lexsort((rows, -scores))
+    return rows[order], scores[order]
+
+
+def top_questions(catalog, rows, scores, n: int) -> list:
+    """The first n scored candidates as `Question`-shaped dicts."""
+    return [
+        {
+            "slug": catalog.slugs[row],
+            "topics": catalog.topics_of(row),
+            "difficulty": DIFFICULTIES[catalog.difficulty[row]],
+            "score": round(float(score), 4)
+        }
+        for row, score in zip(rows[:n], scores[:n])
+    ]
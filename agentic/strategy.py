@@ -0,0 +1,105 @@
+import os
+import threading
+from dataclasses import dataclass
+from agentic.tools import DEFAULT_WEAKNESS_WEIGHTS, score_exploration_topics, score_weak_topics
+
+
+STRATEGIES = ("improve", "exploration")
+
+# Below this margin between the two strategy scores the decision is left to StrategySelectorCrew
+STRATEGY_MARGIN_THRESHOLD = float(os.getenv("STRATEGY_MARGIN_THRESHOLD", 0.15))
+
+# How many of the weakest attempted topics feed the improve score
+WEAK_TOPICS_CONSIDERED = 3
+# How many of the least explored attempted topics feed the explore score
+EXPLORATION_TOPICS_CONSIDERED = 3
+# Attempts after which a topic counts as explored, and topics after which a user counts as broad
+EXPLORED_TOPIC_ATTEMPTS = 5
+BROAD_TOPIC_COUNT = 15
+
+# Process-wide counters of how each decision was made (shared by app sessions and batch threads)
+strategy_stats = {"fast_path": 0, "fallback": 0}
+_stats_lock = threading.Lock()
+
+
+@dataclass
+class StrategyDecision:
+    strategy: str            # "improve", "exploration", or None when the crew has to decide
+    improve_score: float
+    explore_score: float
+    margin: float
+    fast_path: bool
+
+    @property
+    def leaning(self) -> str:
+        """The strategy with the higher score, used when the crew's answer can't be read."""
+        return "improve" if self.improve_score >= self.explore_score else "exploration"
+
+
+def parse_strategy(answer: str):
+    """
+    Normalise the strategy selector's free-text answer (quotes, punctuation, case).
+
+    Returns:
+        str: "improve" or "exploration", or None if the answer is neither.
+    """
+    strategy = str(answer).strip().strip("\"'`.!").strip().lower()
+    return strategy if strategy in STRATEGIES else None
+
+
+def select_strategy(performance_analysis: dict, recently_solved: dict,
+                    threshold: float = STRATEGY_MARGIN_THRESHOLD) -> StrategyDecision:
+    """
+    Decide between "improve" and "exploration" locally from the user's analysed topic stats.
+
+    The improve score is the mean weakness (see `rank_weak_topics`) of the user's weakest
+    attempted topics, scaled to 0..1. The explore score grows as the user gets stronger, as
+    their least explored topics (see `rank_exploration_topics`) have fewer attempts, as they
+    have touched fewer topics overall, and as their recent solves concentrate on the same few topics.
+
+    Args:
+        performance_analysis (dict): Output from `analyse_topic_performance`.
+        recently_solved (dict): Recently solved questions keyed by slug, each with a `topics` list.
+        threshold (float): Minimum margin between the scores for the local decision to stand.
+
+    Returns:
+        StrategyDecision: `strategy` is None when the margin is below `threshold`, meaning
+        the caller should fall back to `StrategySelectorCrew`.
+    """
+    attempted = {
+        topic: metrics for topic, metrics in performance_analysis.items()
+        if metrics.get("count", 0) > 0
+    }
+
+    improve_score = 0.0
+    if attempted:
+        weakest = score_weak_topics(attempted, top_k=WEAK_TOPICS_CONSIDERED)
+        max_score = sum(DEFAULT_WEAKNESS_WEIGHTS.values())
+        improve_score = sum(t["score"] for t in weakest) / len(weakest) / max_score
+
+    # Share of repeated topics among the recent solves: 0 when every tag is distinct
+    recent_topics = [topic for q in (recently_solved or {}).values() for topic in q.get("topics", [])]
+    concentration = 1 - len(set(recent_topics)) / len(recent_topics) if recent_topics else 0.0
+
+    # 0 once the user has touched enough topics and even their least explored ones have enough attempts
+    least_explored = score_exploration_topics(attempted, top_k=EXPLORATION_TOPICS_CONSIDERED)
+    depth = sum(min(t["count"], EXPLORED_TOPIC_ATTEMPTS) for t in least_explored) \
+        / (len(least_explored) * EXPLORED_TOPIC_ATTEMPTS) if least_explored else 0.0
+    breadth = min(len(attempted) / BROAD_TOPIC_COUNT, 1.0)
+    unexplored = 1 - breadth * depth
+
+    explore_score = 0.5 * (1 - improve_score) + 0.3 * unexplored + 0.2 * concentration
+    margin = abs(improve_score - explore_score)
+
+    if margin < threshold:
+        decision = StrategyDecision(None, improve_score, explore_score, margin, fast_path=False)
+    else:
+        strategy = "improve" if improve_score > explore_score else "exploration"
+        decision = StrategyDecision(strategy, improve_score, explore_score, margin, fast_path=True)
+
+    with _stats_lock:
+        strategy_stats["fast_path" if decision.fast_path else "fallback"] += 1
+        fast_path, total = strategy_stats["fast_path"], strategy_stats["fast_path"] + strategy_stats["fallback"]
+    print(f"strategy: {decision.strategy or 'ambiguous'} (improve={improve_score:.2f}, "
+          f"explore={explore_score:.2f}); fast path {fast_path}/{total}")
+    return decision
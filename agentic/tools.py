@@ -1,30 +1,17 @@
-from agentic.models import DataFrameWrapper, Question, Questions
-from crewai.tools import tool
-import pandas as pd
-from typing import List
+from agentic.models import Question
+from catalog import DIFFICULTIES, get_catalog
+from crewai.tools import BaseTool, tool
+from pydantic import BaseModel, Field
+from typing import List, Optional, Type
 
 
+DEFAULT_WEAKNESS_WEIGHTS = {'accuracy': 0.5, 'hints_usage': 0.2, 'youtube_watch_rate': 0.2}
 
-@tool
-def rank_weak_topics(performance_analysis: dict, 
-                     weights: dict = None,
-                     top_k: int = 5) -> list:
-    """
-    Rank topics by combined weakness score based on accuracy, hints usage, and youtube watch rate.
-
-    Args:
-        performance_analysis (dict): Output from `analyse_topic_performance`.
-        weights (dict): Weights for each metric, keys: "accuracy", "hints_usage", "youtube_watch_rate".
-            Defaults to {'accuracy': 0.5, 'hints_usage': 0.2, 'youtube_watch_rate': 0.2}.
-        top_k (int): Number of top weak topics to return.
-
-    Returns:
-        list: List of top_k topics ordered from weakest to less weak, with their scores.
-        Example: [{"topic": "Graphs", "score": 0.78}, ...]
-    """
 
+def score_weak_topics(performance_analysis: dict, weights: dict = None, top_k: int = 5) -> list:
+    """Plain-function form of `rank_weak_topics`, for callers outside an agent."""
     if weights is None:
-        weights = {'accuracy': 0.5, 'hints_usage': 0.2, 'youtube_watch_rate': 0.2}
+        weights = DEFAULT_WEAKNESS_WEIGHTS
 
     scored_topics = []
 
@@ -48,6 +35,42 @@ def rank_weak_topics(performance_analysis: dict,
     return scored_topics[:top_k]
 
 
+def score_exploration_topics(performance_analysis: dict, top_k: int = 5) -> list:
+    """Plain-function form of `rank_exploration_topics`, for callers outside an agent."""
+    if not performance_analysis:
+        return []
+
+    topic_counts = [
+        {"topic": topic, "count": metrics.get("count", 0)}
+        for topic, metrics in performance_analysis.items()
+    ]
+
+    # Sort ascending by attempt count (least explored first)
+    topic_counts.sort(key=lambda x: x["count"])
+
+    return topic_counts[:top_k]
+
+
+@tool
+def rank_weak_topics(performance_analysis: dict, 
+                     weights: dict = None,
+                     top_k: int = 5) -> list:
+    """
+    Rank topics by combined weakness score based on accuracy, hints usage, and youtube watch rate.
+
+    Args:
+        performance_analysis (dict): Output from `analyse_topic_performance`.
+        weights (dict): Weights for each metric, keys: "accuracy", "hints_usage", "youtube_watch_rate".
+            Defaults to {'accuracy': 0.5, 'hints_usage': 0.2, 'youtube_watch_rate': 0.2}.
+        top_k (int): Number of top weak topics to return.
+
+    Returns:
+        list: List of top_k topics ordered from weakest to less weak, with their scores.
+        Example: [{"topic": "Graphs", "score": 0.78}, ...]
+    """
+    return score_weak_topics(performance_analysis, weights, top_k)
+
+
 @tool
 def rank_exploration_topics(performance_analysis: dict, top_k: int = 5) -> list:
     """
@@ -62,38 +85,53 @@ def rank_exploration_topics(performance_analysis: dict, top_k: int = 5) -> list:
         list: List of top_k least explored topics with their counts.
         Example: [{"topic": "Graphs", "count": 2}, ...]
     """
-    if not performance_analysis:
-        return []
+    return score_exploration_topics(performance_analysis, top_k)
 
-    topic_counts = [
-        {"topic": topic, "count": metrics.get("count", 0)}
-        for topic, metrics in performance_analysis.items()
+
+def find_unsolved_questions(topics: List[str], max_difficulty: str = None, exclude: List[str] = None,
+                            top_k: int = 10) -> List[Question]:
+    """
+    Plain-function form of `UnsolvedQuestionsTool`: the catalog questions not in `exclude` that
+    share the most topics with `topics`, returning only slug, topics and difficulty.
+
+    Args:
+        topics (List[str]): Topic slugs to match, e.g. ["graph", "union-find"].
+        max_difficulty (str): Hardest difficulty to include: "Easy", "Medium" or "Hard". Defaults to no limit.
+        exclude (List[str]): Slugs to leave out, usually the user's solved questions.
+        top_k (int): Maximum number of questions to return.
+
+    Returns:
+        List[Question]: At most top_k questions, those sharing the most topics first
+        (ties in catalog order).
+    """
+    catalog = get_catalog()
+    rows, _ = catalog.top_k(topics, k=top_k, max_difficulty=max_difficulty, exclude=exclude)
+    return [
+        Question(slug=catalog.slugs[row], topics=catalog.topics_of(row), difficulty=DIFFICULTIES[catalog.difficulty[row]])
+        for row in rows
     ]
 
-    # Sort ascending by attempt count (least explored first)
-    topic_counts.sort(key=lambda x: x["count"])
 
-    return topic_counts[:top_k]
+class UnsolvedQuestionsInput(BaseModel):
+    topics: List[str] = Field(..., description='Topic slugs to match, e.g. ["graph", "union-find"].')
+    max_difficulty: Optional[str] = Field(
+        None, description='Hardest difficulty to include: "Easy", "Medium" or "Hard". Defaults to no limit.'
+    )
+    top_k: int = Field(10, description="Maximum number of questions to return.")
 
 
-@tool
-def filter_unsolved_questions_by_topic(df: DataFrameWrapper, topics: List[str]) -> Questions:
+class UnsolvedQuestionsTool(BaseTool):
     """
-    Filters questions by topics (1-hot encoded) and returns only title, topics, difficulty.
+    `filter_unsolved_questions_by_topic` for one user. The user's solved questions are bound
+    on the server side (see `ExploreCrew.bind_profile`), so the agent only passes topics.
     """
-    # Validate topic columns exist
-    missing = [t for t in topics if t not in df.columns]
-    if missing:
-        raise ValueError(f"Topic columns not found in DataFrame: {missing}")
-
-    # Filter rows where any of the topic columns is 1
-    mask = df[topics].any(axis=1)
-    filtered_df = df[mask]
-
-    # Keep only needed columns (ensure they exist)
-    for col in ["title", "topics", "difficulty"]:
-        if col not in df.columns:
-            raise ValueError(f"Missing required column: '{col}'")
-
-    filtered_df = filtered_df[["title", "topics", "difficulty"]].rename(columns={'title': 'slug'})
-    return [Question(**row) for row in filtered_df.to_dict(orient="records")]
\ No newline at end of file
+    name: str = "filter_unsolved_questions_by_topic"
+    description: str = (
+        "Finds the questions the user hasn't solved that best match the given topics, "
+        "those sharing the most topics first, and returns only slug, topics and difficulty."
+    )
+    args_schema: Type[BaseModel] = UnsolvedQuestionsInput
+    solved: List[str] = Field(default_factory=list)
+
+    def _run(self, topics: List[str], max_difficulty: str = None, top_k: int = 10) -> List[Question]:
+        return find_unsolved_questions(topics, max_difficulty, exclude=self.solved, top_k=top_k)
@@ -1,32 +1,28 @@
-import os
-from agentic.crew import StrategySelectorCrew, ImproveCrew, ExploreCrew
-from db import driver
-from logger import LeetCodeLogger
-from utils import (
-    analyse_topic_performance,
-    fetch_question_details,
-    get_difficulty_stats,
-    get_recently_solved, 
-    get_topic_performance_stats,
-    get_unsolved_questions,
-    save_knowledge,
-    serialize_datetime
-)
+from agentic.history import recommendation_history
+from agentic.pipeline import recommend
+from session_cache import get_store, invalidate_user, load_catalog, question_details, user_profile
+from tracing import tracer
 import streamlit as st
 from datetime import datetime
-import json
+
+
+def latency_panel(trace):
+    """Where one request's time went: totals per span kind, then every span in start order."""
+    with st.expander("Latency breakdown", expanded=True):
+        st.write({kind: f"{seconds * 1000:.0f} ms" for kind, seconds in trace.totals().items()})
+        st.dataframe(trace.breakdown(), use_container_width=True)
 
 
 def main():
     st.title("LeetCode Logger")
     user_id = st.text_input("User", value="user_001")
+    show_latency = st.sidebar.checkbox("Show latency breakdown", value=False)
 
     question_slug = st.text_input("LeetCode Question Slug (e.g., two-sum)")
-    db = LeetCodeLogger()
-    print(f"neo4j DB: {db.driver}")
+    db = get_store()
 
     if question_slug:
-        question_data = fetch_question_details(question_slug.lower())
+        question_data = question_details(question_slug.lower())
         if question_data:
             st.success(f"Found: {question_data['questionTitle']} ({question_data['difficulty']})")
             st.write("**Topics:**", map(lambda x: x["slug"], question_data["topicTags"]))
@@ -49,77 +45,44 @@ def main():
             "watched_youtube": watched_youtube
         }
 
-        db.log_interaction(
-            user_id=user_id,
-            question_data=question_data,
-            interaction_data=interaction_data,
-            timestamp_logged=datetime.now()
-        )
+        with tracer.trace("log_interaction", user_id=user_id) as trace:
+            db.log_interaction(
+                user_id=user_id,
+                question_data=question_data,
+                interaction_data=interaction_data,
+                timestamp_logged=datetime.now()
+            )
+        invalidate_user(user_id)
+        if show_latency:
+            latency_panel(trace)
 
     if st.button("Recommend a Question"):
-        print(f"fetching user: {user_id} performance data by topic")
-        user_performance_data = analyse_topic_performance(
-            get_topic_performance_stats(user_id)
-        )
-        performance_path = save_knowledge(user_id, user_performance_data, "topic_stats", "json")
-
-        print(f"fetching recently solved questions by {user_id}")
-        recently_solved = get_recently_solved(user_id)
-        recently_solved_path = save_knowledge(user_id, recently_solved, "recently_solved", "json")
-
-        strategy_result = StrategySelectorCrew(user_id=user_id).crew().kickoff()
-
-        print(f"fetching user: {user_id} performance data by difficulty")
-        difficulty_performance_data = get_difficulty_stats(user_id)
-        difficulty_path = save_knowledge(user_id, difficulty_performance_data, "difficulty_stats", "json")
-
-        print(f"fetching user: {user_id} unsolved questions")
-        unsolved_questions = get_unsolved_questions(user_id)
-        unsolved_path = save_knowledge(user_id, unsolved_questions, "unsolved_questions", "csv")
-
-
-        memory_path = os.path.join(os.getcwd(), f"knowledge/{user_id}_past_recommendations.json")
-        # check if memory exists, if not initialise it with an empty dict
-        if not os.path.exists(memory_path):
-            past_user = False
-            past_recommendations = {}
-        else:
-            with open(memory_path, "r") as f:
-                try:
-                    past_recommendations = json.load(f)
-                except json.JSONDecodeError:
-                    past_recommendations = {}
-            past_user = True
-        
-
-        if str(strategy_result) == "improve":
-            result = ImproveCrew(user_id=user_id, past_user=past_user).crew().kickoff()
-        
-        elif str(strategy_result) == "exploration":
-            result = ExploreCrew(user_id=user_id).crew().kickoff()    
-
+        status = st.status("Preparing your recommendation...", expanded=True)
+        partial_results = st.container()
+
+        def on_step(step):
+            if getattr(step, "tool", None):
+                status.write(f"Using tool `{step.tool}`")
+
+        def on_task(output):
+            status.write(f"✓ {output.agent} finished")
+            partial_results.expander(f"{output.agent} output").write(output.raw)
+
+        with tracer.trace("recommend", user_id=user_id) as trace:
+            profile = user_profile(user_id)
+            status.write("Loaded your stats")
+            recommendation = recommend(
+                profile, load_catalog(), progress=status.write, task_callback=on_task, step_callback=on_step
+            )
+        status.update(label="Recommendation ready", state="complete", expanded=False)
+
+        result = recommendation.questions
         if result:
             st.write("**Questions:**", result)
-            for path in [performance_path, recently_solved_path, difficulty_path, unsolved_path]:
-                if os.path.exists(path):
-                    os.remove(path)
+            recommendation_history.record(user_id, [q["slug"] for q in result["questions"]])
+        if show_latency:
+            latency_panel(trace)
 
-            for q in result["questions"]:
-                print(f"now what is q: {q}, {type(q)}, {len(q)}")
-                question_id = q["slug"]
-                if question_id not in past_recommendations:
-                    past_recommendations[question_id] = {
-                        "timestamp": json.dumps(datetime.now(), default=serialize_datetime),
-                        "count": 1
-                    }
-                else:
-                    past_recommendations[question_id]["timestamp"] = json.dumps(datetime.now(), default=serialize_datetime)
-                    past_recommendations[question_id]["count"] += 1
-            
-            with open(memory_path, "w") as f:
-                json.dump(past_recommendations, f, indent=2)
-                print(f"updated memory on {datetime.now()}")
-                
 
 if __name__=="__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from agentic.cache import precomputed_recommendations, recommendation_cache
+from agentic.candidates import candidate_questions, prefilter_candidates, target_topics
+from agentic.pipeline import recommend
+from agentic.scoring import score_candidates
+from agentic.tools import find_unsolved_questions, score_exploration_topics, score_weak_topics
+from bench.stub_llm import StubCrewFactory
+from bench.synthetic import generate_users
+from catalog import get_catalog
+from graph_store import Neo4jGraphStore, SQLiteGraphStore
+from utils import analyse_topic_performance
+
+
+RESULTS_DIR = os.path.join("bench", "results")
+
+# The SQLite store runs in memory, so a benchmark never touches the app's own database
+BACKENDS = {
+    "neo4j": Neo4jGraphStore,
+    "sqlite": lambda: SQLiteGraphStore(":memory:")
+}
+
+
+def percentiles(samples: list) -> dict:
+    """Summary of timings given in seconds, reported in milliseconds."""
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        "n": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "min_ms": round(float(ms.min()), 4),
+        "max_ms": round(float(ms.max()), 4)
+    }
+
+
+class Timings:
+    """Collects samples per benchmark name."""
+
+    def __init__(self):
+        self.samples = {}
+
+
+    def time(self, name: str, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+
+    def summary(self) -> dict:
+        return {name: percentiles(samples) for name, samples in sorted(self.samples.items())}
+
+
+def _quiet(message):
+    pass
+
+
+def run(backend_name: str = "sqlite", users: int = 10, interactions: int = 200, seed: int = 0,
+        repeat: int = 5, log_samples: int = 20, llm_latency: float = 0.0) -> dict:
+    """
+    Load synthetic users into a graph store and time every stage of the logging and recommend paths.
+
+    The first `log_samples` interactions of each user go through `log_interaction` one by one
+    (timed individually); the rest are bulk-loaded with `log_interactions_batch`. Each read
+    query, tool and recommend variant is then timed `repeat` times per user.
+
+    Returns:
+        dict: `meta` describing the run and `results` mapping benchmark name to percentiles.
+    """
+    catalog = get_catalog()
+    backend = BACKENDS[backend_name]()
+    factory = StubCrewFactory(latency=llm_latency)
+    timings = Timings()
+
+    histories = generate_users(catalog, users=users, interactions=interactions, seed=seed)
+    backend.delete_users(histories)
+    timings.time("load_catalog", backend.load_catalog, catalog)
+
+    for user_id, history in histories.items():
+        for interaction in history[:log_samples]:
+            timings.time(
+                "log_interaction", backend.log_interaction, user_id,
+                interaction["question_data"], interaction["interaction_data"], interaction["timestamp_logged"]
+            )
+        if history[log_samples:]:
+            timings.time("log_interactions_batch", backend.log_interactions_batch, user_id, history[log_samples:])
+
+    for user_id, history in histories.items():
+        window_end = history[-1]["timestamp_logged"] + timedelta(days=1)
+        for _ in range(repeat):
+            topic_stats = timings.time("get_topic_performance_stats", backend.get_topic_performance_stats, user_id)
+            timings.time("get_recently_solved", backend.get_recently_solved, user_id)
+            timings.time("get_topic_stats_between", backend.get_topic_stats_between,
+                         user_id, window_end - timedelta(days=30), window_end)
+            timings.time("get_difficulty_stats", backend.get_difficulty_stats, user_id)
+            timings.time("get_unsolved_questions", backend.get_unsolved_questions, user_id)
+            profile = timings.time("get_user_profile", backend.get_user_profile, user_id)
+
+            analysis = timings.time("analyse_topic_performance", analyse_topic_performance, topic_stats)
+            timings.time("tools.score_weak_topics", score_weak_topics, analysis)
+            exploration = timings.time("tools.score_exploration_topics", score_exploration_topics, analysis)
+            timings.time(
+                "tools.find_unsolved_questions", find_unsolved_questions,
+                [t["topic"] for t in exploration], exclude=profile.solved
+            )
+            # The same lookup as an anti-join inside the store
+            timings.time("get_unsolved_candidates", backend.get_unsolved_candidates,
+                         user_id, [t["topic"] for t in exploration], limit=10)
+            candidates = timings.time(
+                "candidates.prefilter", prefilter_candidates,
+                catalog, profile, target_topics(analysis, "improve"), store=backend
+            )
+            timings.time("candidates.exploration_knowledge", candidate_questions,
+                         catalog, profile, analysis, "exploration", store=backend)
+            timings.time("scoring.score_candidates", score_candidates,
+                         catalog, candidates, analysis, profile.difficulty_stats)
+
+            recommendation_cache.invalidate_user(user_id)
+            precomputed_recommendations.invalidate_user(user_id)
+            timings.time("recommend.cold", recommend, profile, catalog, progress=_quiet, factory=factory, store=backend)
+            timings.time("recommend.cached", recommend, profile, catalog, progress=_quiet, factory=factory, store=backend)
+
+    backend.delete_users(histories)
+    return {
+        "meta": {
+            "backend": backend_name,
+            "users": users,
+            "interactions": interactions,
+            "seed": seed,
+            "repeat": repeat,
+            "log_samples": log_samples,
+            "llm_latency": llm_latency,
+            "stub_kickoffs": factory.kickoffs,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version()
+        },
+        "results": timings.summary()
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict):
+    """Print the p50/p95 change of every benchmark present in both runs."""
+    print(f"{'benchmark':45} {'p50 ms':>18} {'p95 ms':>18}")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        cells = [
+            f"{before[key]:.3f} -> {now[key]:.3f}" for key in ("p50_ms", "p95_ms")
+        ]
+        print(f"{name:45} {cells[0]:>18} {cells[1]:>18}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark logging, queries, tools and the recommend path.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="sqlite")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--interactions", type=int, default=200, help="interactions per user")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions of each read per user")
+    parser.add_argument("--log-samples", type=int, default=20, help="interactions per user logged one at a time")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds each stub crew kickoff sleeps")
+    parser.add_argument("--output", help=f"JSON results file (default: {RESULTS_DIR}/<backend>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    report = run(args.backend, args.users, args.interactions, args.seed, args.repeat,
+                 args.log_samples, args.llm_latency)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{args.backend}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in report["results"].items():
+        print(f"{name:45} p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
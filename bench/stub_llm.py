@@ -0,0 +1,55 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+import pandas as pd
+
+
+class StubCrew:
+    """
+    Stands in for a kicked-off crew: answers instantly (plus `latency` seconds) with output
+    derived from the same inputs the real agents get, so the rest of the pipeline runs as usual.
+    """
+
+    def __init__(self, crew_name: str, user_id: str, latency: float = 0.0, count: int = 5):
+        self.crew_name = crew_name
+        self.user_id = user_id
+        self.latency = latency
+        self.count = count
+
+
+    def kickoff(self, inputs: dict = None):
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.crew_name == "StrategySelectorCrew":
+            return "improve"
+
+        if self.crew_name == "RerankCrew":
+            # Keep the local scorer's order
+            return {"questions": json.loads(inputs["candidates"])[:inputs["count"]]}
+
+        # ExploreCrew: the question finder's top candidates from its knowledge file
+        path = os.path.join(os.getcwd(), f"knowledge/{self.user_id}_unsolved_questions.csv")
+        candidates = pd.read_csv(path).head(self.count)
+        return {
+            "questions": [
+                {"slug": row.slug, "topics": row.topics.split("|") if isinstance(row.topics, str) else [],
+                 "difficulty": row.difficulty}
+                for row in candidates.itertuples()
+            ]
+        }
+
+
+class StubCrewFactory:
+    """Drop-in for `CrewFactory` whose crews never call an LLM."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.kickoffs = 0
+
+
+    @contextmanager
+    def lease(self, crew_class, user_id: str, task_callback=None, step_callback=None, profile=None, **kwargs):
+        self.kickoffs += 1
+        yield StubCrew(crew_class.__name__, user_id, self.latency)
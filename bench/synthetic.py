@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+import numpy as np
+from catalog import DIFFICULTIES
+
+
+# Share of attempts per difficulty, and the chance an attempt at each difficulty is solved
+DIFFICULTY_MIX = {"Easy": 0.5, "Medium": 0.38, "Hard": 0.12}
+SOLVE_RATE = {"Easy": 0.8, "Medium": 0.55, "Hard": 0.3}
+
+
+def question_data(catalog, row: int) -> dict:
+    """A catalog row in the shape the alfa-leetcode-api /select endpoint returns."""
+    slug = catalog.slugs[row]
+    return {
+        "titleSlug": slug,
+        "questionId": str(catalog.question_ids[row]),
+        "questionTitle": slug,
+        "difficulty": DIFFICULTIES[catalog.difficulty[row]],
+        "topicTags": [{"slug": topic, "name": topic} for topic in catalog.topics_of(row)],
+        "similarQuestions": "[]"
+    }
+
+
+def generate_users(catalog, users: int = 10, interactions: int = 100, seed: int = 0,
+                   topic_skew: float = 1.2, start: datetime = datetime(2025, 1, 1), days: int = 180,
+                   prefix: str = "bench_user") -> dict:
+    """
+    Synthetic interaction histories sampled over the question catalog, reproducible from `seed`.
+
+    Every user favours topics along a Zipf curve over their own random topic order, so a few
+    topics dominate each history. Questions are drawn with replacement (re-attempts happen)
+    weighted by that preference and DIFFICULTY_MIX, and solves, hints and YouTube views follow
+    the question's difficulty and the user's skill.
+
+    Args:
+        catalog (QuestionCatalog): Catalog to sample questions from.
+        users (int): Number of users.
+        interactions (int): Interactions per user.
+        seed (int): Random seed.
+        topic_skew (float): Zipf exponent of the topic preference; 0 means uniform.
+        start (datetime): Earliest interaction time.
+        days (int): Length of the window interactions are spread over.
+        prefix (str): User id prefix, e.g. "bench_user" -> "bench_user_0001".
+
+    Returns:
+        dict: user_id -> interactions in time order, each a dict with `question_data`,
+            `interaction_data` and `timestamp_logged`, as `log_interactions_batch` takes them.
+    """
+    rng = np.random.default_rng(seed)
+    onehot = np.unpackbits(
+        np.ascontiguousarray(catalog.topic_masks).view(np.uint8), axis=1, bitorder="little"
+    )[:, :len(catalog.topics)].astype(np.float64)
+    difficulty_weight = np.array([DIFFICULTY_MIX[d] for d in DIFFICULTIES])[catalog.difficulty]
+    solve_rate = np.array([SOLVE_RATE[d] for d in DIFFICULTIES])[catalog.difficulty]
+    ranks = np.arange(1, len(catalog.topics) + 1, dtype=np.float64)
+
+    histories = {}
+    for n in range(users):
+        user_id = f"{prefix}_{n + 1:04d}"
+        preference = np.empty(len(catalog.topics))
+        preference[rng.permutation(len(catalog.topics))] = ranks ** -topic_skew
+
+        # Questions without topics still get a small chance
+        weight = (onehot @ preference + preference.min()) * difficulty_weight
+        rows = rng.choice(len(catalog), size=interactions, p=weight / weight.sum())
+
+        skill = rng.normal(0, 0.1)
+        solved = rng.random(interactions) < np.clip(solve_rate[rows] + skill, 0.05, 0.95)
+        hint_used = rng.random(interactions) < np.where(solved, 0.15, 0.5)
+        watched_youtube = rng.random(interactions) < np.where(solved, 0.05, 0.35)
+        offsets = np.sort(rng.uniform(0, days * 86400, size=interactions))
+
+        histories[user_id] = [
+            {
+                "question_data": question_data(catalog, row),
+                "interaction_data": {
+                    "solved": bool(solved[i]),
+                    "time_spent": float(round(rng.gamma(2.0, 12.0), 1)),
+                    "attempts": int(rng.integers(1, 4)),
+                    "hint_used": bool(hint_used[i]),
+                    "watched_youtube": bool(watched_youtube[i])
+                },
+                "timestamp_logged": start + timedelta(seconds=float(offsets[i]))
+            }
+            for i, row in enumerate(rows)
+        ]
+    return histories
@@ -0,0 +1,327 @@
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+QUESTIONS_PATH = os.path.join("data", "questions.csv")
+CATALOG_DIR = os.getenv("QUESTION_CATALOG_DIR", os.path.join("data", "catalog"))
+# Written by catalog_sync.py; preferred over the other formats when present
+CATALOG_PATH = os.getenv("QUESTION_CATALOG_PATH", os.path.join("data", "catalog.parquet"))
+# Schema metadata key holding the topic names in bit order
+TOPICS_METADATA_KEY = b"leetcrew.topics"
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+# Topic bitmasks are little-endian uint64 words, topic j lives in bit j % 64 of word j // 64
+MASK_DTYPE = np.dtype("<u8")
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each uint64 word."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1)
+    return bits.reshape(words.shape + (64,)).sum(axis=-1)
+
+
+def _pack(onehot: np.ndarray) -> np.ndarray:
+    """Pack an (n, topics) 0/1 matrix into (n, words) uint64 bitmasks."""
+    n, n_topics = onehot.shape
+    words = max(1, -(-n_topics // 64))
+    padded = np.zeros((n, words * 64), dtype=np.uint8)
+    padded[:, :n_topics] = onehot
+    return np.packbits(padded, axis=1, bitorder="little").view(MASK_DTYPE)
+
+
+class QuestionCatalog:
+    """
+    In-memory index of the LeetCode question catalog.
+
+    Each question has a row holding its slug, numeric id, difficulty code (index into
+    DIFFICULTIES) and a packed topic bitmask, so topic/difficulty/solved-set filters are
+    a few vectorized bit operations over small NumPy arrays.
+    """
+
+    def __init__(self, slugs: list, question_ids: np.ndarray, difficulty: np.ndarray,
+                 topic_masks: np.ndarray, topics: list):
+        self.slugs = list(slugs)
+        self.question_ids = question_ids
+        self.difficulty = difficulty
+        self.topic_masks = topic_masks
+        self.topics = list(topics)
+        self.slug_index = {slug: row for row, slug in enumerate(self.slugs)}
+        self.topic_index = {topic: bit for bit, topic in enumerate(self.topics)}
+
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """Build the catalog from the one-hot encoded questions.csv frame."""
+        topics = list(df.columns[df.columns.get_loc("difficulty") + 1:])
+        difficulty = df["difficulty"].map({d: code for code, d in enumerate(DIFFICULTIES)})
+        return cls(
+            slugs=df["title"].tolist(),
+            question_ids=df["question_id"].to_numpy(dtype=np.int32),
+            difficulty=difficulty.fillna(len(DIFFICULTIES) - 1).to_numpy(dtype=np.int8),
+            topic_masks=_pack(df[topics].to_numpy(dtype=np.uint8)),
+            topics=topics
+        )
+
+
+    @classmethod
+    def from_csv(cls, path: str = QUESTIONS_PATH):
+        return cls.from_frame(pd.read_csv(path, index_col=0))
+
+
+    @classmethod
+    def from_records(cls, records: list, topics: list = None):
+        """
+        Build the catalog from question dicts with question_id, slug, difficulty and topics.
+
+        Topics keep the bit they have in `topics`; topics not listed there get the next free bits.
+        """
+        topics = list(topics or [])
+        topic_index = {topic: bit for bit, topic in enumerate(topics)}
+        for record in records:
+            for topic in record["topics"]:
+                if topic not in topic_index:
+                    topic_index[topic] = len(topics)
+                    topics.append(topic)
+
+        onehot = np.zeros((len(records), len(topics)), dtype=np.uint8)
+        for row, record in enumerate(records):
+            onehot[row, [topic_index[topic] for topic in record["topics"]]] = 1
+
+        codes = {d: code for code, d in enumerate(DIFFICULTIES)}
+        return cls(
+            slugs=[record["slug"] for record in records],
+            question_ids=np.array([record["question_id"] for record in records], dtype=np.int32),
+            difficulty=np.array(
+                [codes.get(record["difficulty"], len(DIFFICULTIES) - 1) for record in records], dtype=np.int8
+            ),
+            topic_masks=_pack(onehot),
+            topics=topics
+        )
+
+
+    def _topic_lists(self) -> list:
+        onehot = np.unpackbits(
+            np.ascontiguousarray(self.topic_masks).view(np.uint8), axis=1, bitorder="little"
+        )[:, :len(self.topics)]
+        return [[self.topics[bit] for bit in np.flatnonzero(bits)] for bits in onehot]
+
+
+    def to_records(self) -> list:
+        """The catalog as question dicts, the inverse of `from_records`."""
+        return [
+            {
+                "question_id": int(question_id),
+                "slug": slug,
+                "difficulty": DIFFICULTIES[code],
+                "topics": topics
+            }
+            for question_id, slug, code, topics in zip(
+                self.question_ids, self.slugs, self.difficulty, self._topic_lists()
+            )
+        ]
+
+
+    def save(self, path: str = CATALOG_DIR):
+        """Write the catalog as .npy arrays plus a JSON sidecar, loadable with `load`."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "question_ids.npy"), self.question_ids)
+        np.save(os.path.join(path, "difficulty.npy"), self.difficulty)
+        np.save(os.path.join(path, "topic_masks.npy"), self.topic_masks)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"topics": self.topics, "slugs": self.slugs}, f)
+        return path
+
+
+    @classmethod
+    def load(cls, path: str = CATALOG_DIR, mmap: bool = True):
+        """Load a catalog written by `save`, memory-mapping the arrays by default."""
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(
+            slugs=meta["slugs"],
+            question_ids=np.load(os.path.join(path, "question_ids.npy"), mmap_mode=mmap_mode),
+            difficulty=np.load(os.path.join(path, "difficulty.npy"), mmap_mode=mmap_mode),
+            topic_masks=np.load(os.path.join(path, "topic_masks.npy"), mmap_mode=mmap_mode),
+            topics=meta["topics"]
+        )
+
+
+    def save_parquet(self, path: str = CATALOG_PATH):
+        """
+        Write the catalog as a single Parquet file with typed columns: topics as a native list
+        column next to the packed bitmask (a fixed-size list of uint64 words), and the topic bit
+        order in the schema metadata. The file is replaced atomically.
+        """
+        if pq is None:
+            raise ImportError("pyarrow is required for Parquet catalogs: pip install pyarrow")
+
+        words = self.topic_masks.shape[1]
+        table = pa.table({
+            "question_id": pa.array(self.question_ids, pa.int32()),
+            "slug": pa.array(self.slugs, pa.string()),
+            "difficulty": pa.DictionaryArray.from_arrays(
+                pa.array(self.difficulty, pa.int8()), pa.array(DIFFICULTIES)
+            ),
+            "topics": pa.array(self._topic_lists(), pa.list_(pa.string())),
+            "topic_mask": pa.FixedSizeListArray.from_arrays(
+                pa.array(np.ascontiguousarray(self.topic_masks).reshape(-1), pa.uint64()), words
+            )
+        }).replace_schema_metadata({TOPICS_METADATA_KEY: json.dumps(self.topics)})
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+
+    @classmethod
+    def load_parquet(cls, path: str = CATALOG_PATH):
+        """Load a catalog written by `save_parquet`; the bitmask column is used as-is, nothing is re-parsed."""
+        if pq is None:
+            raise ImportError("pyarrow is required for Parquet catalogs: pip install pyarrow")
+
+        table = pq.read_table(
+            path, columns=["question_id", "slug", "difficulty", "topic_mask"], memory_map=True
+        )
+        masks = table.column("topic_mask").combine_chunks()
+        difficulty = table.column("difficulty").combine_chunks()
+        codes = np.array([DIFFICULTIES.index(d) for d in difficulty.dictionary.to_pylist()], dtype=np.int8)
+        return cls(
+            slugs=table.column("slug").to_pylist(),
+            question_ids=table.column("question_id").to_numpy(),
+            difficulty=codes[difficulty.indices.to_numpy()],
+            topic_masks=masks.flatten().to_numpy().reshape(-1, masks.type.list_size),
+            topics=json.loads(table.schema.metadata[TOPICS_METADATA_KEY])
+        )
+
+
+    def __len__(self):
+        return len(self.slugs)
+
+
+    def index_of(self, slugs) -> np.ndarray:
+        """Row indices of the given slugs; slugs not in the catalog are skipped."""
+        return np.fromiter(
+            (self.slug_index[slug] for slug in slugs if slug in self.slug_index), dtype=np.intp
+        )
+
+
+    def mask_of(self, topics) -> np.ndarray:
+        """Bitmask (one uint64 per word) with the bits of the given topics set."""
+        missing = [t for t in topics if t not in self.topic_index]
+        if missing:
+            raise ValueError(f"Unknown topics: {missing}")
+
+        mask = np.zeros(self.topic_masks.shape[1], dtype=MASK_DTYPE)
+        for topic in topics:
+            bit = self.topic_index[topic]
+            mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask
+
+
+    def topics_of(self, row: int) -> list:
+        """Topic names of the question at a row."""
+        bits = np.unpackbits(self.topic_masks[row].view(np.uint8), bitorder="little")
+        return [self.topics[bit] for bit in np.flatnonzero(bits[:len(self.topics)])]
+
+
+    def select(self, any_topics=None, all_topics=None, max_difficulty: str = None,
+               exclude=None) -> np.ndarray:
+        """
+        Row indices of questions matching every given filter, in catalog order.
+
+        Args:
+            any_topics (list): Keep questions tagged with at least one of these topics.
+            all_topics (list): Keep questions tagged with all of these topics.
+            max_difficulty (str): Keep questions at or below this difficulty, e.g. "Medium".
+            exclude (iterable): Slugs to leave out, e.g. the user's solved set.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if any_topics:
+            keep &= (self.topic_masks & self.mask_of(any_topics)).any(axis=1)
+        if all_topics:
+            mask = self.mask_of(all_topics)
+            keep &= ((self.topic_masks & mask) == mask).all(axis=1)
+        if max_difficulty is not None:
+            keep &= self.difficulty <= DIFFICULTIES.index(max_difficulty)
+        if exclude:
+            keep[self.index_of(exclude)] = False
+        return np.flatnonzero(keep)
+
+
+    def top_k(self, topics, k: int = 10, max_difficulty: str = None, exclude=None):
+        """
+        The k questions sharing the most topics with `topics`, after the difficulty and
+        exclusion filters of `select`.
+
+        Overlap is the popcount of each question's bitmask ANDed with the topic mask. Only
+        questions with at least one shared topic are returned, highest overlap first and
+        ties broken by catalog order, so the result is deterministic.
+
+        Returns:
+            tuple: (row indices, overlap counts) as NumPy arrays of length <= k.
+        """
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+
+        rows = self.select(max_difficulty=max_difficulty, exclude=exclude)
+        overlap = _popcount(self.topic_masks[rows] & self.mask_of(topics)).sum(axis=1, dtype=np.int64)
+        matching = overlap > 0
+        rows, overlap = rows[matching], overlap[matching]
+
+        # Unique sort key: overlap first, then earlier catalog rows
+        key = overlap * len(self) + (len(self) - 1 - rows)
+        if len(rows) > k:
+            best = np.argpartition(-key, k - 1)[:k]
+            rows, overlap, key = rows[best], overlap[best], key[best]
+        order = np.argsort(-key)
+        return rows[order], overlap[order]
+
+
+    def to_frame(self, rows=None) -> pd.DataFrame:
+        """Rows of the catalog in the questions.csv layout, one-hot topic columns included."""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        onehot = np.unpackbits(
+            np.ascontiguousarray(self.topic_masks[rows]).view(np.uint8), axis=1, bitorder="little"
+        )[:, :len(self.topics)]
+
+        df = pd.DataFrame({
+            "question_id": self.question_ids[rows],
+            "title": [self.slugs[row] for row in rows],
+            "topics": [[self.topics[bit] for bit in np.flatnonzero(bits)] for bits in onehot],
+            "difficulty": [DIFFICULTIES[code] for code in self.difficulty[rows]]
+        })
+        return pd.concat([df, pd.DataFrame(onehot, columns=self.topics)], axis=1)
+
+
+@lru_cache(maxsize=1)
+def get_catalog() -> QuestionCatalog:
+    """
+    The process-wide catalog: the synced Parquet file if present, then the prebuilt binary,
+    otherwise parsed from questions.csv.
+    """
+    if pq is not None and os.path.exists(CATALOG_PATH):
+        return QuestionCatalog.load_parquet(CATALOG_PATH)
+    if os.path.exists(os.path.join(CATALOG_DIR, "meta.json")):
+        return QuestionCatalog.load(CATALOG_DIR)
+    return QuestionCatalog.from_csv(QUESTIONS_PATH)
+
+
+if __name__ == "__main__":
+    catalog = QuestionCatalog.from_csv(QUESTIONS_PATH)
+    catalog.save(CATALOG_DIR)
+    print(f"Built catalog of {len(catalog)} questions and {len(catalog.topics)} topics in {CATALOG_DIR}")
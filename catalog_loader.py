@@ -0,0 +1,256 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from catalog import get_catalog
+from db import connection_manager
+from logger import SIMILAR_FETCH_WORKERS, LeetCodeLogger, _similar_slugs
+from migrations import ensure_schema
+from tracing import result_counts, tracer
+from utils import chunked, fetch_question_details
+
+
+# Questions per UNWIND transaction
+CATALOG_LOAD_BATCH = int(os.getenv("CATALOG_LOAD_BATCH", 500))
+
+# What the graph already holds, so loads resume and only rewrite changed questions
+CATALOG_FINGERPRINTS_QUERY = """
+// plan-check: allow-scan (reads every question once per load)
+MATCH (q:Question)
+WHERE q.catalog_hash IS NOT NULL
+RETURN q.question_id AS question_id, q.catalog_hash AS catalog_hash,
+       coalesce(q.stats_rebuild_pending, false) AS rebuild_pending
+"""
+
+# Returns the questions whose topics changed, since stats built on the old topics need rebuilding.
+# They are flagged in the same transaction, so a rebuild lost to a crash is retried by the next load.
+LOAD_QUESTIONS_QUERY = """
+UNWIND $rows AS row
+MERGE (q:Question {question_id: row.slug})
+WITH q, row, [(q)-[:HAS_TOPIC]->(old:Topic) | old.name] AS previous_topics
+SET q.frontend_id = row.question_id, q.difficulty = row.difficulty
+
+WITH q, row, previous_topics
+CALL {
+    WITH q, row
+    OPTIONAL MATCH (q)-[stale:HAS_TOPIC]->(old:Topic)
+    WHERE NOT old.name IN row.topics
+    DELETE stale
+}
+CALL {
+    WITH q, row
+    UNWIND row.topics AS topic
+        MERGE (t:Topic {name: topic})
+        MERGE (q)-[:HAS_TOPIC]->(t)
+}
+
+// Set last, so a batch only counts as loaded once its transaction commits
+SET q.catalog_hash = row.hash
+
+WITH q, row, previous_topics
+WHERE size(previous_topics) > 0
+  AND (size(previous_topics) <> size(row.topics) OR any(topic IN row.topics WHERE NOT topic IN previous_topics))
+SET q.stats_rebuild_pending = true
+RETURN q.question_id AS question_id
+"""
+
+# Clears the flag once the users of these questions have been rebuilt
+STATS_REBUILT_QUERY = """
+UNWIND $slugs AS slug
+MATCH (q:Question {question_id: slug})
+REMOVE q.stats_rebuild_pending
+"""
+
+# Users whose TOPIC_STATS and rollups counted any of these questions
+INTERACTED_USERS_QUERY = """
+UNWIND $slugs AS slug
+MATCH (:Question {question_id: slug})<-[:INTERACTED_WITH]-(u:User)
+RETURN DISTINCT u.user_id AS user_id
+"""
+
+# Marks a completed load, so candidate queries can move into the graph
+CATALOG_LOADED_QUERY = """
+MERGE (c:CatalogLoad {name: "questions"})
+SET c.questions = $questions, c.loaded_at = datetime()
+"""
+
+CATALOG_LOAD_STATUS_QUERY = """
+MATCH (c:CatalogLoad {name: "questions"})
+RETURN c.questions AS questions
+"""
+
+UNLINKED_QUESTIONS_QUERY = """
+UNWIND $slugs AS slug
+MATCH (q:Question {question_id: slug})
+WHERE q.similar_loaded_at IS NULL
+RETURN q.question_id AS question_id
+"""
+
+LOAD_SIMILAR_QUERY = """
+UNWIND $rows AS row
+MATCH (q:Question {question_id: row.slug})
+CALL {
+    WITH q, row
+    UNWIND row.similar AS similar_slug
+        MERGE (s:Question {question_id: similar_slug})
+        MERGE (q)-[:IS_SIMILAR_TO]->(s)
+        MERGE (s)-[:IS_SIMILAR_TO]->(q)
+}
+SET q.similar_loaded_at = datetime()
+"""
+
+
+def catalog_hash(record: dict) -> str:
+    """Fingerprint of the catalog fields a Question node is loaded from."""
+    key = json.dumps([record["question_id"], record["difficulty"], sorted(record["topics"])])
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _write(tx, query: str, rows: list):
+    return tx.run(query, rows=rows).consume()
+
+
+def _write_questions(tx, rows: list) -> tuple:
+    """Write one batch of questions; returns the slugs whose topics changed and the result summary."""
+    result = tx.run(LOAD_QUESTIONS_QUERY, rows=rows)
+    changed = [record["question_id"] for record in result]
+    return changed, result.consume()
+
+
+def catalog_loaded() -> bool:
+    """Whether `load_questions` has completed against this graph."""
+    records, _, _ = connection_manager.execute_query(CATALOG_LOAD_STATUS_QUERY)
+    return bool(records)
+
+
+def rebuild_user_stats(slugs: list) -> list:
+    """
+    Recompute TOPIC_STATS and daily rollups for every user who interacted with one of `slugs`,
+    after those questions' topics changed, then clear the questions' rebuild flags.
+
+    Returns:
+        list: The user ids rebuilt.
+    """
+    if not slugs:
+        return []
+    records, _, _ = connection_manager.execute_query(INTERACTED_USERS_QUERY, {"slugs": slugs})
+    user_ids = [record["user_id"] for record in records]
+    logger = LeetCodeLogger()
+    for user_id in user_ids:
+        logger.rebuild_topic_stats(user_id)
+        logger.rebuild_rollups(user_id)
+    connection_manager.execute_query(STATS_REBUILT_QUERY, {"slugs": slugs})
+    return user_ids
+
+
+def load_questions(catalog=None, batch_size: int = CATALOG_LOAD_BATCH) -> dict:
+    """
+    Load every catalog question with its topics into Neo4j, in batched UNWIND transactions.
+
+    Idempotent and resumable: each question stores a fingerprint of its catalog fields, and
+    only questions that are missing or whose fingerprint changed are written. A topic that
+    was removed from a question has its HAS_TOPIC edge deleted, and the TOPIC_STATS and rollups
+    of users who interacted with a question whose topics changed are rebuilt after each batch.
+    Rebuilds a previous load didn't finish are done first.
+
+    Returns:
+        dict: Questions in the catalog, already current, written, batches, users rebuilt and seconds.
+    """
+    catalog = catalog or get_catalog()
+    ensure_schema()
+    start = time.perf_counter()
+
+    with tracer.span("cypher", "catalog_fingerprints") as span:
+        records, _, _ = connection_manager.execute_query(CATALOG_FINGERPRINTS_QUERY)
+        span.set(records=len(records))
+    loaded = {record["question_id"]: record["catalog_hash"] for record in records}
+    pending = [record["question_id"] for record in records if record["rebuild_pending"]]
+
+    rows = []
+    for record in catalog.to_records():
+        fingerprint = catalog_hash(record)
+        if loaded.get(record["slug"]) != fingerprint:
+            rows.append({**record, "hash": fingerprint})
+
+    # Left by a load that stopped between a batch and its rebuild
+    rebuilt = set(rebuild_user_stats(pending))
+    batches = 0
+    retopiced = []
+    with connection_manager.session() as session:
+        for chunk in chunked(rows, batch_size):
+            with tracer.span("cypher", "load_questions", rows=len(chunk)) as span:
+                changed, summary = session.execute_write(_write_questions, chunk)
+                span.set(**result_counts(summary))
+            rebuilt.update(rebuild_user_stats(changed))
+            retopiced += changed
+            batches += 1
+            print(f"Loaded {min(batches * batch_size, len(rows))}/{len(rows)} questions")
+
+    connection_manager.execute_query(CATALOG_LOADED_QUERY, {"questions": len(catalog)})
+
+    return {
+        "questions": len(catalog),
+        "current": len(catalog) - len(rows),
+        "written": len(rows),
+        "batches": batches,
+        "retopiced": len(retopiced),
+        "rebuilt_users": len(rebuilt),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+def load_similar(catalog=None, batch_size: int = CATALOG_LOAD_BATCH, workers: int = SIMILAR_FETCH_WORKERS) -> dict:
+    """
+    Link every catalog question to its similar questions, which the problem list doesn't include.
+
+    Details are fetched concurrently per batch (through the cached API client) and the edges
+    of each batch written in one transaction. Questions are marked once linked, so an
+    interrupted load picks up where it stopped.
+
+    Returns:
+        dict: Questions linked, questions that failed to fetch, similar edges written and seconds.
+    """
+    catalog = catalog or get_catalog()
+    start = time.perf_counter()
+
+    records, _, _ = connection_manager.execute_query(UNLINKED_QUESTIONS_QUERY, {"slugs": catalog.slugs})
+    pending = [record["question_id"] for record in records]
+
+    linked, failed, edges = 0, 0, 0
+    fetch = tracer.wrap(fetch_question_details)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor, connection_manager.session() as session:
+        for chunk in chunked(pending, batch_size):
+            rows = []
+            for slug, details in zip(chunk, executor.map(fetch, chunk)):
+                if details is None:
+                    failed += 1
+                    continue
+                rows.append({"slug": slug, "similar": _similar_slugs(details)})
+            if rows:
+                with tracer.span("cypher", "load_similar", rows=len(rows)) as span:
+                    span.set(**result_counts(session.execute_write(_write, LOAD_SIMILAR_QUERY, rows)))
+            linked += len(rows)
+            edges += sum(len(row["similar"]) for row in rows)
+            print(f"Linked similar questions for {linked}/{len(pending)} questions")
+
+    return {
+        "linked": linked,
+        "failed": failed,
+        "similar": edges,
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load the question catalog into Neo4j.")
+    parser.add_argument("--batch-size", type=int, default=CATALOG_LOAD_BATCH)
+    parser.add_argument("--similar", action="store_true",
+                        help="also fetch each question's similar questions and link them (one API call per question)")
+    args = parser.parse_args()
+
+    with tracer.trace("catalog_load"):
+        print(load_questions(batch_size=args.batch_size))
+        if args.similar:
+            print(load_similar(batch_size=args.batch_size))
@@ -0,0 +1,149 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from catalog import CATALOG_PATH, CATALOG_DIR, QUESTIONS_PATH, QuestionCatalog
+from leetcode_api import client
+from tracing import tracer
+
+
+# Questions per /problems request, and requests in flight at once
+SYNC_PAGE_SIZE = int(os.getenv("CATALOG_SYNC_PAGE_SIZE", 500))
+SYNC_WORKERS = int(os.getenv("CATALOG_SYNC_WORKERS", 8))
+
+
+def _record(question: dict) -> dict:
+    """A /problems entry in the shape `QuestionCatalog.from_records` takes."""
+    return {
+        "question_id": int(question["questionFrontendId"]),
+        "slug": question["titleSlug"],
+        "difficulty": question["difficulty"],
+        "topics": [tag["slug"] for tag in question.get("topicTags") or []]
+    }
+
+
+def fetch_remote(page_size: int = SYNC_PAGE_SIZE, workers: int = SYNC_WORKERS) -> tuple:
+    """
+    Page through /problems: the first page gives the total, the remaining pages are fetched concurrently.
+
+    Pages are revalidated against the API rather than served from the response cache, so
+    unchanged pages cost a 304.
+
+    Returns:
+        tuple: (question records in API order, number of pages fetched)
+    """
+    first = client.problems(page_size, 0, revalidate=True)
+    total = first.get("totalQuestions") or len(first["problemsetQuestionList"])
+    skips = list(range(page_size, total, page_size))
+
+    fetch = tracer.wrap(lambda skip: client.problems(page_size, skip, revalidate=True))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(skips)))) as executor:
+        pages = [first, *executor.map(fetch, skips)]
+
+    # Keyed by slug, in case a question shifted pages between requests
+    records = {}
+    for page in pages:
+        for question in page["problemsetQuestionList"]:
+            records[question["titleSlug"]] = _record(question)
+    return list(records.values()), len(pages)
+
+
+def diff_catalog(local: list, remote: list) -> dict:
+    """Slugs that are new, changed (id, difficulty or topics) or gone in `remote` compared to `local`."""
+    local_by_slug = {record["slug"]: record for record in local}
+    remote_slugs = {record["slug"] for record in remote}
+    new, changed = [], []
+    for record in remote:
+        previous = local_by_slug.get(record["slug"])
+        if previous is None:
+            new.append(record["slug"])
+        elif (previous["question_id"], previous["difficulty"], sorted(previous["topics"])) != \
+                (record["question_id"], record["difficulty"], sorted(record["topics"])):
+            changed.append(record["slug"])
+    removed = [slug for slug in local_by_slug if slug not in remote_slugs]
+    return {"new": new, "changed": changed, "removed": removed}
+
+
+def _local_catalog(path: str):
+    """The catalog to sync into: the Parquet file, else whatever `get_catalog` would load, else None."""
+    if os.path.exists(path):
+        return QuestionCatalog.load_parquet(path)
+    if os.path.exists(os.path.join(CATALOG_DIR, "meta.json")):
+        return QuestionCatalog.load(CATALOG_DIR)
+    if os.path.exists(QUESTIONS_PATH):
+        return QuestionCatalog.from_csv(QUESTIONS_PATH)
+    return None
+
+
+def sync_catalog(path: str = CATALOG_PATH, page_size: int = SYNC_PAGE_SIZE, workers: int = SYNC_WORKERS,
+                 prune: bool = False, dry_run: bool = False) -> dict:
+    """
+    Bring the local catalog up to date with the API, merging only new and changed questions.
+
+    Existing questions keep their rows and topics keep their bits; new questions are appended
+    and new topics get the next free bits. The file is only rewritten when something changed.
+
+    Args:
+        path (str): Parquet catalog to update (created on first sync).
+        page_size (int): Questions per /problems request.
+        workers (int): Concurrent page requests.
+        prune (bool): Also drop questions the API no longer lists.
+        dry_run (bool): Report the delta without writing.
+
+    Returns:
+        dict: Counts of fetched, new, changed, removed and total questions, and timings.
+    """
+    start = time.perf_counter()
+    with tracer.trace("catalog_sync"):
+        remote, pages = fetch_remote(page_size, workers)
+        fetched_at = time.perf_counter()
+
+        local = _local_catalog(path)
+        records = local.to_records() if local is not None else []
+        delta = diff_catalog(records, remote)
+
+        remote_by_slug = {record["slug"]: record for record in remote}
+        merged = {record["slug"]: record for record in records}
+        for slug in delta["new"] + delta["changed"]:
+            merged[slug] = remote_by_slug[slug]
+        if prune:
+            for slug in delta["removed"]:
+                del merged[slug]
+
+        changed = bool(delta["new"] or delta["changed"] or (prune and delta["removed"]))
+        written = False
+        if not dry_run and (changed or not os.path.exists(path)):
+            topics = local.topics if local is not None else sorted({t for r in remote for t in r["topics"]})
+            QuestionCatalog.from_records(list(merged.values()), topics).save_parquet(path)
+            written = True
+
+    return {
+        "pages": pages,
+        "fetched": len(remote),
+        "new": len(delta["new"]),
+        "changed": len(delta["changed"]),
+        "removed": len(delta["removed"]),
+        "pruned": prune,
+        "total": len(merged),
+        "written": written,
+        "fetch_seconds": round(fetched_at - start, 3),
+        "seconds": round(time.perf_counter() - start, 3),
+        "delta": delta
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the question catalog from the LeetCode API.")
+    parser.add_argument("--path", default=CATALOG_PATH, help="Parquet catalog file")
+    parser.add_argument("--page-size", type=int, default=SYNC_PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    parser.add_argument("--prune", action="store_true", help="drop questions the API no longer lists")
+    parser.add_argument("--dry-run", action="store_true", help="report the delta without writing")
+    args = parser.parse_args()
+
+    summary = sync_catalog(args.path, args.page_size, args.workers, args.prune, args.dry_run)
+    delta = summary.pop("delta")
+    for kind in ("new", "changed", "removed"):
+        if delta[kind]:
+            print(f"{kind}: {', '.join(delta[kind][:20])}{' ...' if len(delta[kind]) > 20 else ''}")
+    print(summary)
@@ -1,4 +1,8 @@
+import atexit
 import os
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 
@@ -8,21 +12,123 @@ URI = os.getenv("NEO4J_URI")
 USER = os.getenv("NEO4J_USER")
 PASSWORD = os.getenv("NEO4J_PASSWORD")
 
-# Global, reusable driver
-driver = GraphDatabase.driver(
-    URI,
-    auth=(USER, PASSWORD)
-)
+# Connection pool settings
+MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", 100))
+ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", 60))
+MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", 3600))
 
-try:
+
+class ConnectionManager:
+    """
+    Owns the lifecycle of the shared Neo4j driver and its connection pool.
+
+    The driver is created on first use and closed once at process exit. Request paths
+    borrow sessions through `session()`, or run single statements through `execute_query()`,
+    and must never close the driver themselves.
+    """
+
+    def __init__(self, uri, user, password,
+                 max_pool_size: int = MAX_POOL_SIZE,
+                 acquisition_timeout: float = ACQUISITION_TIMEOUT,
+                 max_connection_lifetime: float = MAX_CONNECTION_LIFETIME):
+        self.uri = uri
+        self.auth = (user, password)
+        self.max_pool_size = max_pool_size
+        self.acquisition_timeout = acquisition_timeout
+        self.max_connection_lifetime = max_connection_lifetime
+        self._driver = None
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._acquired_total = 0
+
+
+    @property
+    def driver(self):
+        """The shared driver, created on first access."""
+        if self._driver is None:
+            with self._lock:
+                if self._driver is None:
+                    self._driver = GraphDatabase.driver(
+                        self.uri,
+                        auth=self.auth,
+                        max_connection_pool_size=self.max_pool_size,
+                        connection_acquisition_timeout=self.acquisition_timeout,
+                        max_connection_lifetime=self.max_connection_lifetime
+                    )
+        return self._driver
+
+
+    @contextmanager
+    def _borrowed(self):
+        """Count one borrower of the pool for the duration of the block."""
+        with self._lock:
+            self._in_use += 1
+            self._acquired_total += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use -= 1
+
+
+    @contextmanager
+    def session(self, **kwargs):
+        """Borrow a session from the pool; its connections are returned when the block exits."""
+        with self._borrowed(), self.driver.session(**kwargs) as session:
+            yield session
+
+
+    def execute_query(self, query: str, parameters: dict = None, **kwargs):
+        """`driver.execute_query`, counted in `pool_metrics` like a borrowed session."""
+        with self._borrowed():
+            return self.driver.execute_query(query, parameters, **kwargs)
+
+
+    def health_check(self) -> dict:
+        """Verify the database is reachable and report the round-trip latency."""
+        start = time.perf_counter()
+        try:
+            self.driver.verify_connectivity()
+            return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+        except Exception as e:
+            return {"ok": False, "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": str(e)}
+
+
+    def pool_metrics(self) -> dict:
+        """Borrowing counters (sessions and `execute_query` calls) measured against the configured pool size."""
+        with self._lock:
+            return {
+                "max_pool_size": self.max_pool_size,
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "acquired_total": self._acquired_total,
+                "utilization": round(self._in_use / self.max_pool_size, 4)
+            }
+
+
+    def close(self):
+        """Close the driver and its pool; a later access creates a fresh one."""
+        with self._lock:
+            if self._driver is not None:
+                self._driver.close()
+                self._driver = None
+
+
+# Global, reusable connection manager
+connection_manager = ConnectionManager(URI, USER, PASSWORD)
+atexit.register(connection_manager.close)
+
+
+def __getattr__(name):
+    # `db.driver` is kept for existing callers; it is created lazily by the manager
+    if name == "driver":
+        return connection_manager.driver
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
     print(URI)
-    print(USER)
-    print(PASSWORD)
-
-    with driver.session() as session:
-        driver.verify_connectivity()
-        res = session.run("MATCH (n) RETURN n")
-        print(f"result: {res.values()}")
-        
-except Exception as e:
-    print(e)
\ No newline at end of file
+    print(f"health: {connection_manager.health_check()}")
+    print(f"pool: {connection_manager.pool_metrics()}")
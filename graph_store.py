@@ -0,0 +1,680 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Protocol
+import pandas as pd
+from agentic.cache import recommendation_cache
+from agentic.models import UserProfile
+from catalog import DIFFICULTIES, get_catalog
+import catalog_loader
+from db import connection_manager
+from logger import ALL_USERS_QUERY, BATCH_CHUNK_SIZE, DELETE_USERS_QUERY, SIMILAR_FETCH_WORKERS, LeetCodeLogger, _interaction_row, _topic_slugs
+from tracing import tracer
+import utils
+from utils import RECENT_ATTEMPTS_SCANNED, RECENTLY_SOLVED_COUNT, _iso_day, fetch_question_details
+
+
+# "neo4j" or "sqlite"
+GRAPH_STORE = os.getenv("GRAPH_STORE", "neo4j")
+GRAPH_SQLITE_PATH = os.getenv("GRAPH_SQLITE_PATH", os.path.join("data", "graph.sqlite3"))
+
+
+class GraphStore(Protocol):
+    """Everything the app, batch job and benchmarks read from or write to the user/question graph."""
+
+    def log_question(self, question_data: dict): ...
+
+    def log_similar_questions(self, question_data: dict, similar_questions: list): ...
+
+    def log_interaction(self, user_id: str, question_data: dict, interaction_data: dict, timestamp_logged): ...
+
+    def log_interactions_batch(self, user_id: str, interactions: list, chunk_size: int = BATCH_CHUNK_SIZE) -> dict: ...
+
+    def get_topic_performance_stats(self, user_id: str) -> dict: ...
+
+    def get_topic_stats_between(self, user_id: str, start, end=None) -> dict: ...
+
+    def get_difficulty_stats(self, user_id: str) -> dict: ...
+
+    def get_recently_solved(self, user_id: str) -> dict: ...
+
+    def get_unsolved_questions(self, user_id: str) -> pd.DataFrame: ...
+
+    def get_unsolved_candidates(self, user_id: str, topics: list, max_difficulty: str = None,
+                                limit: int = 20, skip: int = 0) -> list: ...
+
+    def get_user_profile(self, user_id: str) -> UserProfile: ...
+
+    def list_users(self) -> list: ...
+
+    def delete_users(self, user_ids: list): ...
+
+    def load_catalog(self, catalog=None) -> dict: ...
+
+    def catalog_loaded(self) -> bool: ...
+
+
+class Neo4jGraphStore:
+    """`GraphStore` backed by Neo4j through `LeetCodeLogger` and the `utils.get_*` queries."""
+    name = "neo4j"
+
+    def __init__(self):
+        self.logger = LeetCodeLogger()
+        self._catalog_loaded = False
+
+
+    def log_question(self, question_data):
+        return self.logger.log_question(question_data)
+
+
+    def log_similar_questions(self, question_data, similar_questions):
+        return self.logger.log_similar_questions(question_data, similar_questions)
+
+
+    def log_interaction(self, user_id, question_data, interaction_data, timestamp_logged):
+        self.logger.log_interaction(user_id, question_data, interaction_data, timestamp_logged)
+
+
+    def log_interactions_batch(self, user_id, interactions, chunk_size=BATCH_CHUNK_SIZE):
+        return self.logger.log_interactions_batch(user_id, interactions, chunk_size)
+
+
+    def get_topic_performance_stats(self, user_id):
+        return utils.get_topic_performance_stats(user_id)
+
+
+    def get_topic_stats_between(self, user_id, start, end=None):
+        return utils.get_topic_stats_between(user_id, start, end)
+
+
+    def get_difficulty_stats(self, user_id):
+        return utils.get_difficulty_stats(user_id)
+
+
+    def get_recently_solved(self, user_id):
+        return utils.get_recently_solved(user_id)
+
+
+    def get_unsolved_questions(self, user_id):
+        return utils.get_unsolved_questions(user_id)
+
+
+    def get_unsolved_candidates(self, user_id, topics, max_difficulty=None, limit=20, skip=0):
+        return utils.get_unsolved_candidates(user_id, topics, max_difficulty, limit, skip)
+
+
+    def get_user_profile(self, user_id):
+        return utils.get_user_profile(user_id)
+
+
+    def list_users(self):
+        records, _, _ = connection_manager.execute_query(ALL_USERS_QUERY)
+        return [record["user_id"] for record in records]
+
+
+    def delete_users(self, user_ids):
+        connection_manager.execute_query(DELETE_USERS_QUERY, {"user_ids": list(user_ids)})
+
+
+    def load_catalog(self, catalog=None, similar: bool = False):
+        """Bulk-load the catalog's questions and topics, and optionally their similar questions."""
+        summary = catalog_loader.load_questions(catalog)
+        if similar:
+            summary["similar"] = catalog_loader.load_similar(catalog)
+        return summary
+
+
+    def catalog_loaded(self):
+        # Once loaded, the catalog stays in the graph
+        self._catalog_loaded = self._catalog_loaded or catalog_loader.catalog_loaded()
+        return self._catalog_loaded
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS questions (
+    question_id TEXT PRIMARY KEY,
+    difficulty TEXT,
+    frontend_id INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS question_topics (
+    question_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (question_id, topic)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS question_topics_topic ON question_topics (topic, question_id);
+
+CREATE TABLE IF NOT EXISTS similar_questions (
+    question_id TEXT NOT NULL,
+    similar_id TEXT NOT NULL,
+    PRIMARY KEY (question_id, similar_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS interactions (
+    user_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    solved INTEGER NOT NULL,
+    time_spent REAL,
+    attempts INTEGER,
+    hint_used INTEGER NOT NULL,
+    watched_youtube INTEGER NOT NULL,
+    date_logged TEXT NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS topic_stats (
+    user_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    solved INTEGER NOT NULL,
+    hints_used INTEGER NOT NULL,
+    watched_youtube INTEGER NOT NULL,
+    PRIMARY KEY (user_id, topic)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS attempts (
+    attempt_id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    solved INTEGER NOT NULL,
+    time_spent REAL,
+    attempts INTEGER,
+    hint_used INTEGER NOT NULL,
+    watched_youtube INTEGER NOT NULL,
+    date_logged TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_user_date_logged ON attempts (user_id, date_logged);
+
+CREATE TABLE IF NOT EXISTS topic_rollups (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    solved INTEGER NOT NULL,
+    hints_used INTEGER NOT NULL,
+    watched_youtube INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day, topic)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS catalog_loads (
+    name TEXT PRIMARY KEY,
+    questions INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _timestamp(value) -> str:
+    """ISO timestamp for a datetime or ISO string, with aware times converted to naive UTC."""
+    if value is None:
+        value = datetime.now()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+class SQLiteGraphStore:
+    """
+    Embedded `GraphStore` on a single SQLite file (or ":memory:"), for single-node deployments,
+    tests and benchmarks without a Neo4j server.
+
+    The tables mirror the graph: questions with their topics and similar-question pairs, one
+    latest interaction per (user, question), TOPIC_STATS aggregates kept up to date on every
+    write, and every attempt as an event with daily per-topic rollups. Every read is a primary
+    key or index range lookup.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str = GRAPH_SQLITE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        # Files created before the catalog could be bulk-loaded
+        if "frontend_id" not in {row[1] for row in self._conn.execute("PRAGMA table_info(questions)")}:
+            self._conn.execute("ALTER TABLE questions ADD COLUMN frontend_id INTEGER")
+
+
+    def _write(self, fn, *args):
+        """Run fn(*args) in one write transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+
+    def _read(self, query: str, parameters: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(query, parameters).fetchall()
+
+
+    def _upsert_question(self, title_slug: str, difficulty, topics: list):
+        self._conn.execute(
+            "INSERT INTO questions (question_id, difficulty) VALUES (?, ?) "
+            "ON CONFLICT (question_id) DO UPDATE SET difficulty = coalesce(excluded.difficulty, difficulty)",
+            (title_slug, difficulty)
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO question_topics (question_id, topic) VALUES (?, ?)",
+            [(title_slug, topic) for topic in topics]
+        )
+
+
+    def _link_similar(self, title_slug: str, similar: list):
+        """Link a question to similar questions (dicts with title_slug/difficulty/topics), both ways."""
+        for question in similar:
+            self._upsert_question(question["title_slug"], question["difficulty"], question["topics"])
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO similar_questions (question_id, similar_id) VALUES (?, ?)",
+            [pair for question in similar
+             for pair in ((title_slug, question["title_slug"]), (question["title_slug"], title_slug))]
+        )
+
+
+    def log_question(self, question_data):
+        self._write(
+            self._upsert_question,
+            question_data["titleSlug"], question_data.get("difficulty"), _topic_slugs(question_data)
+        )
+        print(f"Successfully loaded: {question_data['titleSlug']}")
+
+
+    def log_similar_questions(self, question_data, similar_questions):
+        """Link similar questions, fetching metadata only for those not stored yet, concurrently."""
+        slugs = []
+        for similar_question in similar_questions:
+            if not isinstance(similar_question, dict):
+                similar_question = json.loads(similar_question)
+            if similar_question["titleSlug"] not in slugs:
+                slugs.append(similar_question["titleSlug"])
+        if not slugs:
+            return similar_questions
+
+        known = {
+            row[0] for row in self._read(
+                f"SELECT question_id FROM questions "
+                f"WHERE question_id IN ({','.join('?' * len(slugs))}) AND difficulty IS NOT NULL",
+                tuple(slugs)
+            )
+        }
+        missing = [slug for slug in slugs if slug not in known]
+        details = {}
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(SIMILAR_FETCH_WORKERS, len(missing))) as executor:
+                details = dict(zip(missing, executor.map(tracer.wrap(fetch_question_details), missing)))
+
+        similar = [
+            {
+                "title_slug": slug,
+                "difficulty": details[slug]["difficulty"] if details.get(slug) else None,
+                "topics": _topic_slugs(details[slug]) if details.get(slug) else []
+            }
+            for slug in slugs
+        ]
+        self._write(self._link_similar, question_data["titleSlug"], similar)
+        print(f"Linked {len(similar)} similar questions ({len(missing)} fetched, {len(known)} already known)")
+        return similar_questions
+
+
+    def _write_row(self, user_id: str, row: dict):
+        """The SQLite counterpart of one INTERACTIONS_QUERY row."""
+        slug = row["title_slug"]
+        self._upsert_question(slug, row["difficulty"], row["topics"])
+        self._link_similar(slug, [{"title_slug": s, "difficulty": None, "topics": []} for s in row["similar"]])
+
+        solved, hint_used, watched_youtube = int(bool(row["solved"])), int(bool(row["hint_used"])), int(bool(row["watched_youtube"]))
+        date_logged = _timestamp(row["timestamp_logged"])
+
+        previous = self._conn.execute(
+            "SELECT solved, hint_used, watched_youtube FROM interactions WHERE user_id = ? AND question_id = ?",
+            (user_id, slug)
+        ).fetchone()
+        existed, was_solved, had_hint, had_youtube = (1, *previous) if previous else (0, 0, 0, 0)
+
+        self._conn.execute(
+            "INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_id, question_id) DO UPDATE SET solved = excluded.solved, "
+            "time_spent = excluded.time_spent, attempts = excluded.attempts, hint_used = excluded.hint_used, "
+            "watched_youtube = excluded.watched_youtube, date_logged = excluded.date_logged",
+            (user_id, slug, solved, row["time_spent"], row["attempts"], hint_used, watched_youtube, date_logged)
+        )
+
+        # Deltas, so re-logging a question replaces what its previous interaction counted for
+        self._conn.execute(
+            "INSERT INTO topic_stats SELECT ?, topic, ?, ?, ?, ? FROM question_topics WHERE question_id = ? "
+            "ON CONFLICT (user_id, topic) DO UPDATE SET count = count + excluded.count, "
+            "solved = solved + excluded.solved, hints_used = hints_used + excluded.hints_used, "
+            "watched_youtube = watched_youtube + excluded.watched_youtube",
+            (user_id, 1 - existed, solved - was_solved, hint_used - had_hint, watched_youtube - had_youtube, slug)
+        )
+
+        self._conn.execute(
+            "INSERT INTO attempts (user_id, question_id, solved, time_spent, attempts, hint_used, watched_youtube, "
+            "date_logged) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (user_id, slug, solved, row["time_spent"], row["attempts"], hint_used, watched_youtube, date_logged)
+        )
+        self._conn.execute(
+            "INSERT INTO topic_rollups SELECT ?, ?, topic, 1, ?, ?, ? FROM question_topics WHERE question_id = ? "
+            "ON CONFLICT (user_id, day, topic) DO UPDATE SET count = count + 1, solved = solved + excluded.solved, "
+            "hints_used = hints_used + excluded.hints_used, watched_youtube = watched_youtube + excluded.watched_youtube",
+            (user_id, date_logged[:10], solved, hint_used, watched_youtube, slug)
+        )
+
+
+    @tracer.traced("sqlite", "write_interactions")
+    def _write_rows(self, user_id: str, rows: list):
+        self._conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
+        for row in rows:
+            self._write_row(user_id, row)
+
+
+    def log_interaction(self, user_id, question_data, interaction_data, timestamp_logged):
+        self.log_question(question_data)
+        similar_questions = json.loads(question_data.get("similarQuestions") or "[]")
+        self.log_similar_questions(question_data, similar_questions)
+
+        row = _interaction_row(question_data, interaction_data, timestamp_logged, include_similar=False)
+        self._write(self._write_rows, user_id, [row])
+        recommendation_cache.invalidate_user(user_id)
+
+
+    def log_interactions_batch(self, user_id, interactions, chunk_size=BATCH_CHUNK_SIZE):
+        rows = [
+            _interaction_row(i["question_data"], i["interaction_data"], i.get("timestamp_logged"))
+            for i in interactions
+        ]
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        start = time.perf_counter()
+        # One transaction per chunk, like the Cypher batch writes
+        for chunk in chunks:
+            self._write(self._write_rows, user_id, chunk)
+        elapsed = time.perf_counter() - start
+        recommendation_cache.invalidate_user(user_id)
+        return {
+            "rows": len(rows),
+            "chunks": len(chunks),
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(len(rows) / elapsed, 1) if elapsed > 0 else None
+        }
+
+
+    @tracer.traced("sqlite")
+    def get_topic_performance_stats(self, user_id):
+        topic_stats = {
+            topic: {"count": count, "solved": solved, "hints_used": hints_used, "watched_youtube": watched_youtube}
+            for topic, count, solved, hints_used, watched_youtube in self._read(
+                "SELECT topic, count, solved, hints_used, watched_youtube FROM topic_stats "
+                "WHERE user_id = ? AND count > 0 ORDER BY count DESC",
+                (user_id,)
+            )
+        }
+        for topic in get_catalog().topics:
+            topic_stats.setdefault(topic, {"count": 0, "solved": 0, "hints_used": 0, "watched_youtube": 0})
+        return topic_stats
+
+
+    @tracer.traced("sqlite")
+    def get_topic_stats_between(self, user_id, start, end=None):
+        if end is None:
+            end = date.today() + timedelta(days=1)
+        return {
+            topic: {"count": count, "solved": solved, "hints_used": hints_used, "watched_youtube": watched_youtube}
+            for topic, count, solved, hints_used, watched_youtube in self._read(
+                "SELECT topic, SUM(count) AS count, SUM(solved), SUM(hints_used), SUM(watched_youtube) "
+                "FROM topic_rollups WHERE user_id = ? AND day >= ? AND day < ? "
+                "GROUP BY topic ORDER BY count DESC",
+                (user_id, _iso_day(start), _iso_day(end))
+            )
+        }
+
+
+    @tracer.traced("sqlite")
+    def get_difficulty_stats(self, user_id):
+        return {
+            difficulty: {"count": count, "solved": solved}
+            for difficulty, count, solved in self._read(
+                "SELECT q.difficulty, COUNT(*), SUM(i.solved) FROM interactions i "
+                "JOIN questions q ON q.question_id = i.question_id "
+                "WHERE i.user_id = ? GROUP BY q.difficulty",
+                (user_id,)
+            )
+        }
+
+
+    @tracer.traced("sqlite")
+    def get_recently_solved(self, user_id):
+        # Newest solved attempts first off the (user_id, date_logged) index, widening the scan
+        # like `utils._read_recently_solved` while re-solves crowd it
+        scan = RECENT_ATTEMPTS_SCANNED
+        while True:
+            rows = self._read(
+                """
+                WITH scanned AS (
+                    SELECT question_id, date_logged FROM attempts
+                    WHERE user_id = ? AND solved = 1 ORDER BY date_logged DESC LIMIT ?
+                )
+                SELECT r.question_id, q.difficulty, r.date_logged,
+                       (SELECT json_group_array(topic) FROM question_topics t WHERE t.question_id = r.question_id),
+                       (SELECT COUNT(*) FROM scanned)
+                FROM (
+                    SELECT question_id, MAX(date_logged) AS date_logged
+                    FROM scanned
+                    GROUP BY question_id
+                    ORDER BY date_logged DESC
+                    LIMIT ?
+                ) r
+                JOIN questions q ON q.question_id = r.question_id
+                ORDER BY r.date_logged DESC
+                """,
+                (user_id, scan, RECENTLY_SOLVED_COUNT)
+            )
+            if len(rows) >= RECENTLY_SOLVED_COUNT or not rows or rows[0][4] < scan:
+                break
+            scan *= 4
+        return {
+            question_id: {
+                "difficulty": difficulty,
+                "topics": json.loads(topics),
+                "date_logged": datetime.fromisoformat(date_logged)
+            }
+            for question_id, difficulty, date_logged, topics, _ in rows
+        }
+
+
+    def _solved(self, user_id) -> list:
+        return [row[0] for row in self._read(
+            "SELECT question_id FROM interactions WHERE user_id = ? AND solved = 1 ORDER BY question_id",
+            (user_id,)
+        )]
+
+
+    @tracer.traced("sqlite")
+    def get_unsolved_questions(self, user_id):
+        catalog = get_catalog()
+        return catalog.to_frame(catalog.select(exclude=self._solved(user_id)))
+
+
+    @tracer.traced("sqlite")
+    def get_unsolved_candidates(self, user_id, topics, max_difficulty=None, limit=20, skip=0):
+        """Anti-join on the (topic, question_id) index and the interactions primary key; see `utils.get_unsolved_candidates`."""
+        topics = list(topics)
+        if not topics:
+            return []
+        difficulties = DIFFICULTIES if max_difficulty is None else DIFFICULTIES[:DIFFICULTIES.index(max_difficulty) + 1]
+        rows = self._read(
+            f"""
+            SELECT q.question_id, q.difficulty, COUNT(*) AS overlap,
+                   (SELECT json_group_array(topic) FROM question_topics t WHERE t.question_id = q.question_id)
+            FROM question_topics qt
+            JOIN questions q ON q.question_id = qt.question_id
+            WHERE qt.topic IN ({','.join('?' * len(topics))})
+              AND q.difficulty IN ({','.join('?' * len(difficulties))})
+              AND NOT EXISTS (
+                  SELECT 1 FROM interactions i
+                  WHERE i.user_id = ? AND i.question_id = q.question_id AND i.solved = 1
+              )
+            GROUP BY q.question_id
+            ORDER BY overlap DESC, q.frontend_id IS NULL, q.frontend_id, q.question_id
+            LIMIT ? OFFSET ?
+            """,
+            (*topics, *difficulties, user_id, limit, skip)
+        )
+        return [
+            {"slug": slug, "difficulty": difficulty, "overlap": overlap, "topics": json.loads(question_topics)}
+            for slug, difficulty, overlap, question_topics in rows
+        ]
+
+
+    @tracer.traced("sqlite")
+    def get_user_profile(self, user_id):
+        # One read transaction, so the snapshot is consistent like the single Cypher query
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                topic_stats = self.get_topic_performance_stats(user_id)
+                difficulty_stats = self.get_difficulty_stats(user_id)
+                recently_solved = self.get_recently_solved(user_id)
+                solved = self._solved(user_id)
+            finally:
+                self._conn.execute("COMMIT")
+
+        return UserProfile(
+            user_id=user_id,
+            topic_stats=topic_stats,
+            difficulty_stats={d: s for d, s in difficulty_stats.items() if d is not None},
+            recently_solved={
+                slug: {**question, "date_logged": question["date_logged"].isoformat()}
+                for slug, question in recently_solved.items()
+            },
+            solved=solved
+        )
+
+
+    def list_users(self):
+        return [row[0] for row in self._read("SELECT user_id FROM users ORDER BY user_id")]
+
+
+    def delete_users(self, user_ids):
+        def delete(user_ids):
+            for table in ("interactions", "topic_stats", "attempts", "topic_rollups", "users"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE user_id = ?", [(u,) for u in user_ids])
+        self._write(delete, list(user_ids))
+
+
+    def _rebuild_user_stats(self, user_ids: list):
+        """Recompute topic_stats and topic_rollups of these users from their interactions and attempts."""
+        for user_id in user_ids:
+            self._conn.execute("DELETE FROM topic_stats WHERE user_id = ?", (user_id,))
+            self._conn.execute(
+                "INSERT INTO topic_stats SELECT i.user_id, qt.topic, COUNT(*), SUM(i.solved), SUM(i.hint_used), "
+                "SUM(i.watched_youtube) FROM interactions i JOIN question_topics qt ON qt.question_id = i.question_id "
+                "WHERE i.user_id = ? GROUP BY qt.topic",
+                (user_id,)
+            )
+            self._conn.execute("DELETE FROM topic_rollups WHERE user_id = ?", (user_id,))
+            self._conn.execute(
+                "INSERT INTO topic_rollups SELECT a.user_id, substr(a.date_logged, 1, 10) AS day, qt.topic, COUNT(*), "
+                "SUM(a.solved), SUM(a.hint_used), SUM(a.watched_youtube) "
+                "FROM attempts a JOIN question_topics qt ON qt.question_id = a.question_id "
+                "WHERE a.user_id = ? GROUP BY day, qt.topic",
+                (user_id,)
+            )
+
+
+    def _load_records(self, records: list) -> tuple:
+        previous = {}
+        for question_id, topic in self._conn.execute("SELECT question_id, topic FROM question_topics"):
+            previous.setdefault(question_id, set()).add(topic)
+        retopiced = [
+            r["slug"] for r in records
+            if r["slug"] in previous and previous[r["slug"]] != set(r["topics"])
+        ]
+
+        self._conn.executemany(
+            "INSERT INTO questions (question_id, difficulty, frontend_id) VALUES (?, ?, ?) "
+            "ON CONFLICT (question_id) DO UPDATE SET difficulty = excluded.difficulty, frontend_id = excluded.frontend_id",
+            [(r["slug"], r["difficulty"], r["question_id"]) for r in records]
+        )
+        # Replace topic lists, so topics dropped from a question don't linger
+        self._conn.executemany(
+            "DELETE FROM question_topics WHERE question_id = ?", [(r["slug"],) for r in records]
+        )
+        self._conn.executemany(
+            "INSERT INTO question_topics (question_id, topic) VALUES (?, ?)",
+            [(r["slug"], topic) for r in records for topic in r["topics"]]
+        )
+
+        # Stats built on a question's old topics are recomputed for everyone who interacted with it
+        user_ids = set()
+        for chunk in utils.chunked(retopiced, 500):
+            user_ids.update(row[0] for row in self._conn.execute(
+                f"SELECT DISTINCT user_id FROM interactions WHERE question_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+        self._rebuild_user_stats(sorted(user_ids))
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO catalog_loads (name, questions, loaded_at) VALUES ('questions', ?, ?)",
+            (len(records), _timestamp(None))
+        )
+        return retopiced, sorted(user_ids)
+
+
+    def load_catalog(self, catalog=None):
+        """
+        Load every catalog question and its topics in one transaction; safe to repeat. Users who
+        interacted with a question whose topics changed get their topic stats and rollups rebuilt.
+        """
+        catalog = catalog or get_catalog()
+        start = time.perf_counter()
+        records = catalog.to_records()
+        retopiced, rebuilt = self._write(self._load_records, records)
+        for user_id in rebuilt:
+            recommendation_cache.invalidate_user(user_id)
+        return {
+            "questions": len(records),
+            "written": len(records),
+            "retopiced": len(retopiced),
+            "rebuilt_users": len(rebuilt),
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+
+    def catalog_loaded(self):
+        return bool(self._read("SELECT 1 FROM catalog_loads WHERE name = 'questions'"))
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=1)
+def get_graph_store() -> GraphStore:
+    """The process-wide store selected by GRAPH_STORE."""
+    if GRAPH_STORE == "sqlite":
+        return SQLiteGraphStore(GRAPH_SQLITE_PATH)
+    if GRAPH_STORE == "neo4j":
+        return Neo4jGraphStore()
+    raise ValueError(f"Unknown GRAPH_STORE: {GRAPH_STORE!r} (expected 'neo4j' or 'sqlite')")
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+# Directory for on-disk caches and stores
+CACHE_DIR = os.getenv("LEETCREW_CACHE_DIR", ".cache")
+
+
+@dataclass
+class CacheEntry:
+    value: object
+    meta: dict = field(default_factory=dict)
+    stored_at: float = 0.0
+    fresh: bool = True
+
+
+class SQLiteCache:
+    """
+    Disk-backed key/value cache with TTL expiry and LRU eviction, safe to share between threads.
+
+    Args:
+        path (str): SQLite file the cache lives in (":memory:" for a process-local cache).
+        table (str): Table holding the entries, so several caches can share one file.
+        ttl (float): Seconds an entry stays fresh; None means entries never expire.
+        max_entries (int): LRU size cap; None means unbounded.
+        dumps / loads: Value (de)serializers, JSON by default.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: float = None, max_entries: int = None,
+                 dumps=json.dumps, loads=json.loads):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._dumps = dumps
+        self._loads = loads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value BLOB,
+                meta TEXT,
+                tag TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_tag ON {table} (tag)")
+
+
+    def get(self, key: str, allow_stale: bool = False):
+        """
+        Look up a key, refreshing its LRU position.
+
+        Returns:
+            CacheEntry or None: None when the key is absent, or expired and `allow_stale` is False.
+            Expired entries returned with `allow_stale` have `fresh=False`.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, meta, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, meta, stored_at = row
+            fresh = self.ttl is None or now - stored_at < self.ttl
+            if not fresh and not allow_stale:
+                self.misses += 1
+                return None
+
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+
+        return CacheEntry(
+            value=self._loads(value),
+            meta=json.loads(meta) if meta else {},
+            stored_at=stored_at,
+            fresh=fresh
+        )
+
+
+    def set(self, key: str, value, meta: dict = None, tag: str = None):
+        """Store a value, evicting the least recently used entries past `max_entries`."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, meta, tag, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self._dumps(value), json.dumps(meta) if meta else None, tag, now, now)
+            )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+
+    def touch(self, key: str):
+        """Mark an entry as fresh again, e.g. after a successful revalidation."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE {self.table} SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+
+
+    def invalidate(self, key: str = None, tag: str = None) -> int:
+        """Delete one key, every entry with a tag, or (with neither) the whole cache."""
+        with self._lock:
+            if key is not None:
+                cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            elif tag is not None:
+                cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE tag = ?", (tag,))
+            else:
+                cursor = self._conn.execute(f"DELETE FROM {self.table}")
+        return cursor.rowcount
+
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale
+        }
+
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,123 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from kvcache import CACHE_DIR, SQLiteCache
+from tracing import tracer
+
+
+# LEETCODE_API = "https://alfa-leetcode-api.onrender.com" # replace with local host
+LEETCODE_API = os.getenv("LEETCODE_API", "http://localhost:3000")
+
+# Response cache settings
+CACHE_TTL = float(os.getenv("LEETCODE_CACHE_TTL", 24 * 60 * 60))
+CACHE_MAX_ENTRIES = int(os.getenv("LEETCODE_CACHE_MAX_ENTRIES", 5000))
+CACHE_PATH = os.getenv("LEETCODE_CACHE_PATH", os.path.join(CACHE_DIR, "leetcode_api.sqlite3"))
+
+# Connection pool settings
+POOL_SIZE = int(os.getenv("LEETCODE_POOL_SIZE", 10))
+REQUEST_TIMEOUT = float(os.getenv("LEETCODE_TIMEOUT", 30))
+
+
+class LeetCodeClient:
+    """
+    Client for the alfa-leetcode-api with a pooled keep-alive session and a disk-backed response cache.
+
+    Fresh cache entries are served without touching the network. Expired entries are
+    revalidated with If-None-Match / If-Modified-Since, and a 304 only refreshes the entry.
+    """
+
+    def __init__(self, base_url: str = LEETCODE_API, cache: SQLiteCache = None,
+                 pool_size: int = POOL_SIZE, timeout: float = REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache if cache is not None else SQLiteCache(
+            CACHE_PATH, table="responses", ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES
+        )
+        self.requests = 0
+        self.revalidated = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
+    def get_json(self, path: str, params: dict, cache_key: str, revalidate: bool = False):
+        """
+        GET `path` and return the decoded JSON body, going through the response cache.
+
+        With `revalidate`, a fresh cached copy is treated as expired, so the request still
+        goes out but an unchanged response comes back as a cheap 304.
+
+        Raises:
+            requests.RequestException: If the request fails and there is no cached copy to fall back on.
+        """
+        with tracer.span("http", path) as span:
+            return self._get_json(path, params, cache_key, span, revalidate)
+
+
+    def _get_json(self, path: str, params: dict, cache_key: str, span, revalidate: bool = False):
+        entry = self.cache.get(cache_key, allow_stale=True)
+        if entry is not None and entry.fresh and not revalidate:
+            span.set(cache="fresh")
+            return entry.value
+
+        headers = {}
+        if entry is not None:
+            if entry.meta.get("etag"):
+                headers["If-None-Match"] = entry.meta["etag"]
+            if entry.meta.get("last_modified"):
+                headers["If-Modified-Since"] = entry.meta["last_modified"]
+
+        self.requests += 1
+        try:
+            response = self.session.get(
+                f"{self.base_url}{path}", params=params, headers=headers, timeout=self.timeout
+            )
+            if response.status_code == 304 and entry is not None:
+                self.revalidated += 1
+                span.set(cache="revalidated")
+                self.cache.touch(cache_key)
+                return entry.value
+            response.raise_for_status()
+        except requests.RequestException:
+            if entry is not None:
+                print(f"Serving stale cached response for {cache_key}")
+                span.set(cache="stale")
+                return entry.value
+            raise
+
+        span.set(cache="miss", status=response.status_code)
+        data = response.json()
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        self.cache.set(cache_key, data, meta=meta)
+        return data
+
+
+    def question(self, title_slug: str) -> dict:
+        """Fetch a single question's details, cached by slug."""
+        return self.get_json("/select", {"titleSlug": title_slug}, cache_key=f"select:{title_slug}")
+
+
+    def problems(self, limit: int, skip: int = 0, revalidate: bool = False) -> dict:
+        """Fetch a page of the problem list."""
+        return self.get_json(
+            "/problems", {"limit": limit, "skip": skip}, cache_key=f"problems:{limit}:{skip}",
+            revalidate=revalidate
+        )
+
+
+    def stats(self) -> dict:
+        """Cache hit/miss counters plus the number of network requests made."""
+        return {
+            **self.cache.stats(),
+            "requests": self.requests,
+            "revalidated": self.revalidated
+        }
+
+
+# Global, reusable client
+client = LeetCodeClient()
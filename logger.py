@@ -1,14 +1,282 @@
 import ast
+from agentic.cache import recommendation_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import db
+from migrations import ensure_schema
 from neo4j import GraphDatabase
-from utils import fetch_question_details
+from tracing import result_counts, tracer
+from utils import chunked, fetch_question_details
 import json
+import os
+import time
+
+
+# Rows per UNWIND chunk (one write transaction each) for batched ingestion
+BATCH_CHUNK_SIZE = int(os.getenv("NEO4J_BATCH_SIZE", 1000))
+
+# $latest holds one row per question (the last in the chunk): Cypher runs each clause for every
+# row before the next, so a question repeated within one statement would read the INTERACTED_WITH
+# edge as it was before the chunk and count twice in TOPIC_STATS. Every row in $rows is an attempt.
+INTERACTIONS_QUERY = """
+MERGE (u:User {user_id: $user_id})
+WITH u
+CALL {
+    WITH u
+    UNWIND $latest AS row
+        MERGE (q:Question {question_id: row.title_slug})
+        SET q.difficulty = coalesce(row.difficulty, q.difficulty)
+
+        WITH u, q, row
+        CALL {
+            WITH q, row
+            UNWIND row.topics AS topic
+                MERGE (t:Topic {name: topic})
+                MERGE (q)-[:HAS_TOPIC]->(t)
+        }
+        CALL {
+            WITH q, row
+            UNWIND row.similar AS similar_title_slug
+                MERGE (s:Question {question_id: similar_title_slug})
+                MERGE (q)-[:IS_SIMILAR_TO]->(s)
+                MERGE (s)-[:IS_SIMILAR_TO]->(q)
+        }
+
+        // Remember what a previously logged interaction counted for before overwriting it
+        MERGE (u)-[r:INTERACTED_WITH]->(q)
+        WITH u, q, r, row,
+             CASE WHEN r.solved IS NULL THEN 0 ELSE 1 END AS existed,
+             CASE WHEN r.solved = true THEN 1 ELSE 0 END AS was_solved,
+             CASE WHEN r.hint_used = true THEN 1 ELSE 0 END AS had_hint,
+             CASE WHEN r.watched_youtube = true THEN 1 ELSE 0 END AS had_youtube
+        SET r.solved = row.solved,
+            r.time_spent = row.time_spent,
+            r.attempts = row.attempts,
+            r.hint_used = row.hint_used,
+            r.watched_youtube = row.watched_youtube,
+            r.date_logged = datetime(row.timestamp_logged)
+
+        WITH u, q, row, existed, was_solved, had_hint, had_youtube
+        CALL {
+            WITH u, q, row, existed, was_solved, had_hint, had_youtube
+            MATCH (q)-[:HAS_TOPIC]->(t:Topic)
+            MERGE (u)-[s:TOPIC_STATS]->(t)
+            ON CREATE SET s.count = 0, s.solved = 0, s.hints_used = 0, s.watched_youtube = 0
+            SET s.count = s.count + 1 - existed,
+                s.solved = s.solved + (CASE WHEN row.solved = true THEN 1 ELSE 0 END) - was_solved,
+                s.hints_used = s.hints_used + (CASE WHEN row.hint_used = true THEN 1 ELSE 0 END) - had_hint,
+                s.watched_youtube = s.watched_youtube + (CASE WHEN row.watched_youtube = true THEN 1 ELSE 0 END) - had_youtube
+        }
+}
+
+// Every attempt is also kept as its own event, rolled up per user, topic and day
+CALL {
+    WITH u
+    UNWIND $rows AS row
+        MATCH (q:Question {question_id: row.title_slug})
+        CREATE (a:Attempt {
+            user_id: u.user_id,
+            question_id: q.question_id,
+            solved: row.solved,
+            time_spent: row.time_spent,
+            attempts: row.attempts,
+            hint_used: row.hint_used,
+            watched_youtube: row.watched_youtube,
+            date_logged: datetime(row.timestamp_logged)
+        })
+        CREATE (u)-[:LOGGED]->(a)-[:ATTEMPT_OF]->(q)
+
+        WITH a, q
+        MATCH (q)-[:HAS_TOPIC]->(t:Topic)
+        MERGE (d:TopicRollup {user_id: a.user_id, day: date(a.date_logged), topic: t.name})
+        ON CREATE SET d.count = 0, d.solved = 0, d.hints_used = 0, d.watched_youtube = 0
+        SET d.count = d.count + 1,
+            d.solved = d.solved + (CASE WHEN a.solved = true THEN 1 ELSE 0 END),
+            d.hints_used = d.hints_used + (CASE WHEN a.hint_used = true THEN 1 ELSE 0 END),
+            d.watched_youtube = d.watched_youtube + (CASE WHEN a.watched_youtube = true THEN 1 ELSE 0 END)
+}
+"""
+
+# Backfills Attempt events for interactions that have none (e.g. loaded outside this logger)
+# and recomputes the user's daily TopicRollup nodes from their events
+REBUILD_ROLLUPS_QUERY = """
+MATCH (u:User {user_id: $user_id})
+
+CALL {
+    WITH u
+    MATCH (u)-[i:INTERACTED_WITH]->(q:Question)
+    WHERE i.date_logged IS NOT NULL
+      AND NOT EXISTS { MATCH (u)-[:LOGGED]->(:Attempt)-[:ATTEMPT_OF]->(q) }
+    CREATE (a:Attempt {
+        user_id: u.user_id,
+        question_id: q.question_id,
+        solved: i.solved,
+        time_spent: i.time_spent,
+        attempts: i.attempts,
+        hint_used: i.hint_used,
+        watched_youtube: i.watched_youtube,
+        date_logged: i.date_logged
+    })
+    CREATE (u)-[:LOGGED]->(a)-[:ATTEMPT_OF]->(q)
+    RETURN COUNT(a) AS backfilled
+}
+
+CALL {
+    WITH u
+    // A predicate on every property of the composite rollup index, so the lookup can use it
+    OPTIONAL MATCH (d:TopicRollup)
+    WHERE d.user_id = u.user_id AND d.day IS NOT NULL AND d.topic IS NOT NULL
+    DELETE d
+    RETURN COUNT(d) AS deleted
+}
+
+CALL {
+    WITH u
+    MATCH (u)-[:LOGGED]->(a:Attempt)-[:ATTEMPT_OF]->(:Question)-[:HAS_TOPIC]->(t:Topic)
+    WITH a.user_id AS user_id, date(a.date_logged) AS day, t.name AS topic,
+         COUNT(a) AS count,
+         SUM(CASE WHEN a.solved = true THEN 1 ELSE 0 END) AS solved,
+         SUM(CASE WHEN a.hint_used = true THEN 1 ELSE 0 END) AS hints_used,
+         SUM(CASE WHEN a.watched_youtube = true THEN 1 ELSE 0 END) AS watched_youtube
+    CREATE (d:TopicRollup {user_id: user_id, day: day, topic: topic, count: count, solved: solved,
+                           hints_used: hints_used, watched_youtube: watched_youtube})
+    RETURN COUNT(d) AS rollups
+}
+
+RETURN backfilled, rollups
+"""
+
+# Recomputes a user's TOPIC_STATS aggregates from their INTERACTED_WITH edges
+REBUILD_TOPIC_STATS_QUERY = """
+MATCH (u:User {user_id: $user_id})
+OPTIONAL MATCH (u)-[old:TOPIC_STATS]->(:Topic)
+DELETE old
+
+WITH DISTINCT u
+MATCH (u)-[i:INTERACTED_WITH]->(q:Question)-[:HAS_TOPIC]->(t:Topic)
+WITH u, t,
+     COUNT(q) AS count,
+     SUM(CASE WHEN i.solved = true THEN 1 ELSE 0 END) AS solved,
+     SUM(CASE WHEN i.hint_used = true THEN 1 ELSE 0 END) AS hints_used,
+     SUM(CASE WHEN i.watched_youtube = true THEN 1 ELSE 0 END) AS watched_youtube
+MERGE (u)-[s:TOPIC_STATS]->(t)
+SET s.count = count,
+    s.solved = solved,
+    s.hints_used = hints_used,
+    s.watched_youtube = watched_youtube
+RETURN COUNT(s) AS topics
+"""
+
+ALL_USERS_QUERY = """
+// plan-check: allow-scan (enumerates every user on purpose)
+MATCH (u:User)
+RETURN u.user_id AS user_id
+"""
+
+# Removes users together with their attempt events and rollups
+DELETE_USERS_QUERY = """
+UNWIND $user_ids AS user_id
+MATCH (u:User {user_id: user_id})
+CALL {
+    WITH u
+    OPTIONAL MATCH (u)-[:LOGGED]->(a:Attempt)
+    DETACH DELETE a
+}
+CALL {
+    WITH user_id
+    OPTIONAL MATCH (d:TopicRollup)
+    WHERE d.user_id = user_id AND d.day IS NOT NULL AND d.topic IS NOT NULL
+    DETACH DELETE d
+}
+DETACH DELETE u
+"""
+
+
+# Upper bound on concurrent metadata requests when expanding similar questions
+SIMILAR_FETCH_WORKERS = int(os.getenv("SIMILAR_FETCH_WORKERS", 8))
+
+KNOWN_QUESTIONS_QUERY = """
+MATCH (q:Question)
+WHERE q.question_id IN $slugs AND q.difficulty IS NOT NULL
+RETURN q.question_id AS question_id
+"""
+
+SIMILAR_QUESTIONS_QUERY = """
+MERGE (q:Question {question_id: $title_slug})
+WITH q
+UNWIND $similar AS similar
+    MERGE (s:Question {question_id: similar.title_slug})
+    SET s.difficulty = coalesce(similar.difficulty, s.difficulty)
+    MERGE (q)-[:IS_SIMILAR_TO]->(s)
+    MERGE (s)-[:IS_SIMILAR_TO]->(q)
+
+    WITH s, similar
+    UNWIND similar.topics AS topic
+        MERGE (t:Topic {name: topic})
+        MERGE (s)-[:HAS_TOPIC]->(t)
+"""
+
+
+def _topic_slugs(question_data: dict) -> list:
+    """Return the topic slugs of a question, whether topicTags is a list or its string form."""
+    if isinstance(question_data["topicTags"], list):
+        topics = question_data["topicTags"]
+    else:
+        topics = ast.literal_eval(question_data["topicTags"])  # safely parse string → list
+
+    # Ensure it's just slugs (strings), not dicts
+    return [t["slug"] if isinstance(t, dict) else t for t in topics]
+
+
+def _similar_slugs(question_data: dict) -> list:
+    """Return the title slugs listed in a question's similarQuestions field."""
+    similar_questions = question_data.get("similarQuestions") or []
+    if isinstance(similar_questions, str):
+        similar_questions = json.loads(similar_questions)
+
+    slugs = []
+    for similar_question in similar_questions:
+        if not isinstance(similar_question, dict):
+            similar_question = json.loads(similar_question)
+        slugs.append(similar_question["titleSlug"])
+    return slugs
+
+
+def _interaction_row(question_data: dict, interaction_data: dict, timestamp_logged,
+                     include_similar: bool = True) -> dict:
+    """Flatten one interaction into a row for INTERACTIONS_QUERY."""
+    if timestamp_logged is None:
+        timestamp_logged = datetime.now()
+
+    return {
+        "title_slug": question_data["titleSlug"],
+        "difficulty": question_data.get("difficulty"),
+        "topics": _topic_slugs(question_data) if "topicTags" in question_data else [],
+        "similar": _similar_slugs(question_data) if include_similar else [],
+        "solved": interaction_data["solved"],
+        "time_spent": interaction_data["time_spent"],
+        "attempts": interaction_data["attempts"],
+        "hint_used": interaction_data["hint_used"],
+        "watched_youtube": interaction_data["watched_youtube"],
+        "timestamp_logged": timestamp_logged
+    }
+
+
+def _latest_rows(rows: list) -> list:
+    """The last row per question, in order of each question's first appearance."""
+    return list({row["title_slug"]: row for row in rows}.values())
+
+
+@tracer.traced("cypher")
+def _write_interactions(tx, user_id: str, rows: list):
+    """Transaction function writing one chunk of interaction rows."""
+    return tx.run(INTERACTIONS_QUERY, user_id=user_id, rows=rows, latest=_latest_rows(rows)).consume()
 
 
 class LeetCodeLogger:
     def __init__(self):
         self.driver = db.driver
+        ensure_schema()
 
     
     def log_question(self, question_data: dict):
@@ -28,13 +296,7 @@ class LeetCodeLogger:
         RETURN q
         """
 
-        if isinstance(question_data["topicTags"], list):
-            topics = question_data["topicTags"]
-        else:
-            topics = ast.literal_eval(question_data["topicTags"])  # safely parse string → list
-
-        # Ensure it's just slugs (strings), not dicts
-        topics = [t["slug"] for t in topics]
+        topics = _topic_slugs(question_data)
 
         # Prepare parameters for the query
         parameters = {
@@ -45,7 +307,9 @@ class LeetCodeLogger:
 
         try:
             # Execute the query using your Neo4j driver
-            result = self.driver.execute_query(query, parameters)
+            with tracer.span("cypher", "log_question") as span:
+                result = db.connection_manager.execute_query(query, parameters)
+                span.set(**result_counts(result))
             print(f"Successfully loaded: {question_data["titleSlug"]}")
             return result[0]  # Optionally, return the result if you need to process the created Question node
         except Exception as e:
@@ -58,35 +322,51 @@ class LeetCodeLogger:
         """
         Log the similar questions for a given question.
         Creates relationships between the current question and its similar questions.
-        """
-        print(f"Main Question: {question}")
-        print("\n")
-        print("SIMILAR QUESTIONS")
-        print(similar_questions)
-        print(type(similar_questions))
 
+        Metadata is fetched concurrently, and only for similar questions not already in
+        the graph; all nodes and both-direction edges are then written in one statement.
+        """
+        similar_title_slugs = []
         for similar_question in similar_questions:
-            if isinstance(similar_question, dict):
-                similar_question = similar_question
-            else:
+            if not isinstance(similar_question, dict):
                 similar_question = json.loads(similar_question)
-            similar_title_slug = similar_question["titleSlug"]
-            similar_question_data = fetch_question_details(similar_title_slug)
-            self.log_question(similar_question_data)
-
-            query = """
-            MERGE (q:Question {question_id: $title_slug})
-            MERGE (s:Question {question_id: $similar_title_slug})
-            MERGE (q)-[:IS_SIMILAR_TO]->(s)
-            MERGE (s)-[:IS_SIMILAR_TO]->(q)
-            """
-
-            parameters = {
+            if similar_question["titleSlug"] not in similar_title_slugs:
+                similar_title_slugs.append(similar_question["titleSlug"])
+
+        if not similar_title_slugs:
+            return similar_questions
+
+        # Only fetch metadata for questions the graph doesn't know yet
+        with tracer.span("cypher", "known_questions") as span:
+            records, _, _ = db.connection_manager.execute_query(
+                KNOWN_QUESTIONS_QUERY, {"slugs": similar_title_slugs}
+            )
+            span.set(records=len(records))
+        known = {record["question_id"] for record in records}
+        missing = [slug for slug in similar_title_slugs if slug not in known]
+
+        details = {}
+        if missing:
+            workers = min(SIMILAR_FETCH_WORKERS, len(missing))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                details = dict(zip(missing, executor.map(tracer.wrap(fetch_question_details), missing)))
+
+        similar = []
+        for slug in similar_title_slugs:
+            question_data = details.get(slug)
+            similar.append({
+                "title_slug": slug,
+                "difficulty": question_data["difficulty"] if question_data else None,
+                "topics": _topic_slugs(question_data) if question_data else []
+            })
+
+        parameters = {
             "title_slug": question["titleSlug"],
-            "similar_title_slug": similar_title_slug
-        }   
-        
-            self.driver.execute_query(query, parameters)
+            "similar": similar
+        }
+        with tracer.span("cypher", "link_similar_questions") as span:
+            span.set(**result_counts(db.connection_manager.execute_query(SIMILAR_QUESTIONS_QUERY, parameters)))
+        print(f"Linked {len(similar)} similar questions ({len(missing)} fetched, {len(known)} already known)")
 
         return similar_questions
 
@@ -107,30 +387,131 @@ class LeetCodeLogger:
         similar_questions = json.loads(question_data.get("similarQuestions", []))
         self.log_similar_questions(question_data, similar_questions)
 
-        
-        query = """MERGE (u:User {user_id: $user_id})
-        MERGE (q:Question {question_id: $title_slug})
-        MERGE (u)-[r:INTERACTED_WITH]->(q)
-        SET r.solved = $solved,
-            r.time_spent = $time_spent,
-            r.attempts = $attempts,
-            r.hint_used = $hint_used,
-            r.watched_youtube = $watched_youtube,
-            r.date_logged = datetime($timestamp_logged)
-        """
 
         # form interaction relationship between user and question
-        parameters = {
-            "user_id": user_id,
-            "title_slug": question_data["titleSlug"],
-            "solved": interaction_data["solved"],
-            "time_spent": interaction_data["time_spent"],
-            "attempts": interaction_data["attempts"],
-            "hint_used": interaction_data["hint_used"],
-            "watched_youtube": interaction_data["watched_youtube"],
-            "timestamp_logged": timestamp_logged
+        # (similar question edges were already written above)
+        row = _interaction_row(question_data, interaction_data, timestamp_logged, include_similar=False)
+
+        with db.connection_manager.session() as session:
+            session.execute_write(_write_interactions, user_id, [row])
+        recommendation_cache.invalidate_user(user_id)
+
+
+    def log_interactions_batch(self, user_id, interactions: list, chunk_size: int = BATCH_CHUNK_SIZE) -> dict:
+        """
+        Log many interactions for one user with chunked UNWIND writes.
+
+        Each chunk is written in a single managed write transaction, creating the question
+        nodes, their topics, similar-question edges and the interaction relationships.
+        Similar questions are linked by slug only; their metadata is not fetched.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            interactions (list): Dictionaries with the same shape as the arguments of
+                `log_interaction`: "question_data", "interaction_data" and an optional
+                "timestamp_logged".
+            chunk_size (int): Number of interactions per transaction.
+
+        Returns:
+            dict: Throughput summary with rows, chunks, seconds and rows_per_second.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        rows = [
+            _interaction_row(
+                interaction["question_data"],
+                interaction["interaction_data"],
+                interaction.get("timestamp_logged")
+            )
+            for interaction in interactions
+        ]
+
+        start = time.perf_counter()
+        chunks = 0
+        with db.connection_manager.session() as session:
+            for chunk in chunked(rows, chunk_size):
+                session.execute_write(_write_interactions, user_id, chunk)
+                chunks += 1
+        elapsed = time.perf_counter() - start
+        recommendation_cache.invalidate_user(user_id)
+
+        summary = {
+            "rows": len(rows),
+            "chunks": chunks,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(len(rows) / elapsed, 1) if elapsed > 0 else None
+        }
+        print(f"Logged {summary['rows']} interactions for {user_id} in {summary['chunks']} chunks "
+              f"({summary['seconds']}s, {summary['rows_per_second']} rows/s)")
+        return summary
+
+
+    def rebuild_topic_stats(self, user_id: str = None) -> dict:
+        """
+        Recompute the TOPIC_STATS aggregates from the interaction history, for one user or all of them.
+        Needed once for interactions logged before the aggregates existed, or written outside this logger.
+
+        Returns:
+            dict: Mapping of user id to the number of topics with stats.
+        """
+        if user_id is None:
+            records, _, _ = db.connection_manager.execute_query(ALL_USERS_QUERY)
+            user_ids = [record["user_id"] for record in records]
+        else:
+            user_ids = [user_id]
+
+        rebuilt = {}
+        with db.connection_manager.session() as session:
+            for uid in user_ids:
+                record = session.execute_write(
+                    lambda tx, uid=uid: tx.run(REBUILD_TOPIC_STATS_QUERY, user_id=uid).single()
+                )
+                rebuilt[uid] = record["topics"] if record else 0
+                recommendation_cache.invalidate_user(uid)
+                print(f"Rebuilt topic stats for {uid}: {rebuilt[uid]} topics")
+        return rebuilt
+
+
+    def rebuild_rollups(self, user_id: str) -> dict:
+        """
+        Backfill Attempt events for a user's interactions that have none and recompute
+        their daily TopicRollup nodes.
+
+        Returns:
+            dict: Number of backfilled events and of rollup nodes written.
+        """
+        with db.connection_manager.session() as session:
+            record = session.execute_write(
+                lambda tx: tx.run(REBUILD_ROLLUPS_QUERY, user_id=user_id).single()
+            )
+        rebuilt = {
+            "backfilled": record["backfilled"] if record else 0,
+            "rollups": record["rollups"] if record else 0
         }
+        print(f"Rebuilt rollups for {user_id}: {rebuilt}")
+        return rebuilt
+
 
-        print(f"parameters for log interaction: {parameters}")
+if __name__ == "__main__":
+    import argparse
 
-        self.driver.execute_query(query, parameters)
+    parser = argparse.ArgumentParser(description="LeetCodeLogger maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser("rebuild-topic-stats", help="Recompute per-user topic aggregates")
+    rebuild.add_argument("--user", help="Only rebuild this user (default: all users)")
+    rollups = subparsers.add_parser("rebuild-rollups", help="Backfill attempt events and recompute daily rollups")
+    rollups.add_argument("--user", help="Only rebuild this user (default: all users)")
+    args = parser.parse_args()
+
+    logger = LeetCodeLogger()
+    if args.command == "rebuild-topic-stats":
+        logger.rebuild_topic_stats(args.user)
+    elif args.command == "rebuild-rollups":
+        if args.user:
+            user_ids = [args.user]
+        else:
+            records, _, _ = db.connection_manager.execute_query(ALL_USERS_QUERY)
+            user_ids = [record["user_id"] for record in records]
+        for user_id in user_ids:
+            logger.rebuild_rollups(user_id)
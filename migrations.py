@@ -0,0 +1,147 @@
+import ast
+import re
+import sys
+from db import connection_manager
+
+
+# Versioned schema changes, applied in order and recorded as (:SchemaMigration) nodes.
+# Never edit an applied migration; append a new version instead.
+MIGRATIONS = [
+    (1, "uniqueness constraints for merged keys", [
+        "CREATE CONSTRAINT schema_migration_version IF NOT EXISTS FOR (m:SchemaMigration) REQUIRE m.version IS UNIQUE",
+        "CREATE CONSTRAINT question_question_id IF NOT EXISTS FOR (q:Question) REQUIRE q.question_id IS UNIQUE",
+        "CREATE CONSTRAINT user_user_id IF NOT EXISTS FOR (u:User) REQUIRE u.user_id IS UNIQUE",
+        "CREATE CONSTRAINT topic_name IF NOT EXISTS FOR (t:Topic) REQUIRE t.name IS UNIQUE"
+    ]),
+    (2, "indexes for attempt events and daily topic rollups", [
+        "CREATE INDEX attempt_date_logged IF NOT EXISTS FOR (a:Attempt) ON (a.date_logged)",
+        "CREATE INDEX attempt_user_date_logged IF NOT EXISTS FOR (a:Attempt) ON (a.user_id, a.date_logged)",
+        "CREATE INDEX topic_rollup_user_day_topic IF NOT EXISTS FOR (d:TopicRollup) ON (d.user_id, d.day, d.topic)"
+    ]),
+    (3, "catalog load marker", [
+        "CREATE CONSTRAINT catalog_load_name IF NOT EXISTS FOR (c:CatalogLoad) REQUIRE c.name IS UNIQUE"
+    ])
+]
+
+# Modules whose Cypher statements must be index-backed
+PLAN_CHECKED_MODULES = ["utils.py", "logger.py", "catalog_loader.py"]
+
+# Plan operators that mean a statement reads a whole label or the whole graph
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+
+# Statements containing this marker scan on purpose and are skipped by the plan check
+ALLOW_SCAN_MARKER = "plan-check: allow-scan"
+
+# Placeholder values for parameters whose type matters while planning
+PLAN_CHECK_PARAMETERS = {"scan": 1, "limit": 1, "skip": 0}
+
+CYPHER_START = re.compile(
+    r"^\s*(//[^\n]*\n\s*)*(OPTIONAL\s+MATCH|MATCH|MERGE|UNWIND|CALL|CREATE|WITH)\b", re.IGNORECASE
+)
+SCHEMA_STATEMENT = re.compile(r"^\s*(CREATE|DROP)\s+(CONSTRAINT|INDEX)\b", re.IGNORECASE)
+
+_migrated = False
+
+
+def current_version(session) -> int:
+    record = session.run("MATCH (m:SchemaMigration) RETURN max(m.version) AS version").single()
+    return record["version"] or 0
+
+
+def migrate(target: int = None) -> int:
+    """
+    Apply every migration newer than the recorded schema version, up to `target`.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    with connection_manager.session() as session:
+        version = current_version(session)
+        for number, description, statements in MIGRATIONS:
+            if number <= version or (target is not None and number > target):
+                continue
+            # Schema statements can't share a transaction with writes, so each runs on its own
+            for statement in statements:
+                session.run(statement).consume()
+            session.run(
+                "MERGE (m:SchemaMigration {version: $version}) "
+                "SET m.description = $description, m.applied_at = datetime()",
+                version=number, description=description
+            ).consume()
+            version = number
+            print(f"Applied schema migration {number}: {description}")
+    return version
+
+
+def ensure_schema():
+    """Bring the schema up to date, once per process."""
+    global _migrated
+    if not _migrated:
+        migrate()
+        _migrated = True
+
+
+def cypher_statements(path: str) -> list:
+    """(line, statement) for every string literal in a Python file that reads as a Cypher query."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [
+        (node.lineno, node.value)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str)
+        and CYPHER_START.match(node.value) and not SCHEMA_STATEMENT.match(node.value)
+    ]
+
+
+def _scan_operators(plan) -> list:
+    operator = plan["operatorType"].split("@")[0]
+    found = [operator] if operator in SCAN_OPERATORS else []
+    for child in plan.get("children", []):
+        found += _scan_operators(child)
+    return found
+
+
+def check_query_plans(paths=PLAN_CHECKED_MODULES) -> list:
+    """
+    EXPLAIN every Cypher statement in `paths` and report those planned with a label or all-nodes scan.
+
+    Returns:
+        list: (path, line, operators) for each offending statement; empty when all are index-backed.
+    """
+    failures = []
+    with connection_manager.session() as session:
+        for path in paths:
+            for line, statement in cypher_statements(path):
+                if ALLOW_SCAN_MARKER in statement:
+                    continue
+                parameters = {
+                    name: PLAN_CHECK_PARAMETERS.get(name)
+                    for name in set(re.findall(r"\$(\w+)", statement))
+                }
+                plan = session.run(f"EXPLAIN {statement}", parameters).consume().plan
+                scans = _scan_operators(plan)
+                if scans:
+                    failures.append((path, line, sorted(set(scans))))
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Neo4j schema migrations")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "status", "check-plans"])
+    parser.add_argument("--target", type=int, help="Migrate up to this version only")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        print(f"Schema version: {migrate(args.target)}")
+    elif args.command == "status":
+        with connection_manager.session() as session:
+            version = current_version(session)
+        print(f"Schema version: {version} (latest: {MIGRATIONS[-1][0]})")
+    elif args.command == "check-plans":
+        failures = check_query_plans()
+        for path, line, scans in failures:
+            print(f"{path}:{line}: planned with {', '.join(scans)}")
+        print("All statements are index-backed" if not failures else f"{len(failures)} statement(s) scan")
+        sys.exit(1 if failures else 0)
@@ -0,0 +1,64 @@
+import os
+import requests
+import streamlit as st
+from agentic.models import UserProfile
+from catalog import QuestionCatalog, get_catalog
+from graph_store import GraphStore, get_graph_store
+from leetcode_api import client
+
+
+# Seconds a cached profile is trusted when nothing was logged from this app,
+# e.g. interactions loaded by test.py or another process
+PROFILE_TTL = float(os.getenv("STREAMLIT_PROFILE_TTL", 5 * 60))
+QUESTION_TTL = float(os.getenv("STREAMLIT_QUESTION_TTL", 24 * 60 * 60))
+
+
+@st.cache_resource
+def get_store() -> GraphStore:
+    """The graph store (and with it the pooled driver or SQLite connection), shared by every session and rerun."""
+    return get_graph_store()
+
+
+@st.cache_resource
+def load_catalog() -> QuestionCatalog:
+    return get_catalog()
+
+
+@st.cache_resource
+def _stats_versions() -> dict:
+    # Bumped per user after each logged interaction; part of the profile cache key
+    return {}
+
+
+@st.cache_data(ttl=QUESTION_TTL, show_spinner=False)
+def _question_details(slug: str) -> dict:
+    return client.question(slug)
+
+
+def question_details(slug: str):
+    """
+    A question's metadata, fetched once per slug across reruns.
+
+    Failed lookups are not cached, so a retry after fixing a typo or restarting the API works.
+    """
+    try:
+        return _question_details(slug)
+    except requests.RequestException as e:
+        print(f"Error fetching problems: {e}")
+        return None
+
+
+@st.cache_data(ttl=PROFILE_TTL, show_spinner=False)
+def _user_profile(user_id: str, version: int) -> UserProfile:
+    return get_store().get_user_profile(user_id)
+
+
+def user_profile(user_id: str) -> UserProfile:
+    """The user's stats snapshot, reused until they log an interaction or PROFILE_TTL passes."""
+    return _user_profile(user_id, _stats_versions().get(user_id, 0))
+
+
+def invalidate_user(user_id: str):
+    """Forget the user's cached stats; call after writing their interactions."""
+    versions = _stats_versions()
+    versions[user_id] = versions.get(user_id, 0) + 1
@@ -1,4 +1,6 @@
-from db import driver
+import json
+from collections import defaultdict
+from graph_store import get_graph_store
 
 mock_interactions = mock_interactions = [
     {
@@ -231,38 +233,39 @@ mock_interactions += [
 ]
 
 
-query = """
-MERGE (u:User {user_id: $user_id})
-MERGE (q:Question {question_id: $question_id})
-SET q.title = $title, q.difficulty = $difficulty
-
-MERGE (u)-[r:INTERACTED_WITH]->(q)
-SET r.solved = $solved,
-    r.time_spent = $time_spent,
-    r.attempts = $attempts,
-    r.hint_used = $hint_used,
-    r.watched_youtube = $watched_youtube,
-    r.date_logged = datetime($date_logged)
+def _as_logged(interaction: dict) -> dict:
+    """A mock row in the shape `log_interactions_batch` takes."""
+    return {
+        "question_data": {
+            "titleSlug": interaction["question_id"],
+            "questionTitle": interaction["title"],
+            "difficulty": interaction["difficulty"],
+            "topicTags": [
+                {"name": topic, "slug": topic.lower().replace(" ", "-")} for topic in interaction["topics"]
+            ],
+            "similarQuestions": json.dumps([{"titleSlug": slug} for slug in interaction["similar_questions"]])
+        },
+        "interaction_data": {
+            "solved": interaction["solved"],
+            "time_spent": interaction["time_spent"],
+            "attempts": interaction["attempts"],
+            "hint_used": interaction["hint_used"],
+            "watched_youtube": interaction["watched_youtube"]
+        },
+        "timestamp_logged": interaction["date_logged"]
+    }
 
-WITH q
-UNWIND $topics AS topic
-    MERGE (t:Topic {name: topic})
-    MERGE (q)-[:HAS_TOPIC]->(t)
 
-WITH q, $similar_questions AS similar_questions
-UNWIND similar_questions AS similar_question_id
-    MERGE (similar_q:Question {question_id: similar_question_id})
-    MERGE (q)-[:SIMILAR_TO]->(similar_q)
-"""
+def load_mock_data(store, interactions):
+    """Load mock interactions through the configured graph store, one batch per user."""
+    by_user = defaultdict(list)
+    for interaction in interactions:
+        by_user[interaction["user_id"]].append(_as_logged(interaction))
 
-def load_mock_data(driver, interactions):
-    print(driver)
+    for user_id, rows in by_user.items():
+        summary = store.log_interactions_batch(user_id, rows)
+        print(f"Loaded {summary['rows']} mock interactions for {user_id} in {summary['seconds']:.3f}s.")
 
-    with driver.session(database="neo4j") as session:
-        for interaction in interactions:
-            session.run(query, **interaction)
-    print(f"Loaded {len(interactions)} mock interactions.")
 
 if __name__ == "__main__":
-    load_mock_data(driver, mock_interactions)
-    driver.close()
+    load_mock_data(get_graph_store(), mock_interactions)
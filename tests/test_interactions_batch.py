@@ -0,0 +1,94 @@
+import os
+import uuid
+import pytest
+from graph_store import SQLiteGraphStore
+from logger import _interaction_row, _latest_rows
+
+
+def _interaction(slug: str, topics: list, solved: bool, hint_used: bool, timestamp: str) -> dict:
+    return {
+        "question_data": {"titleSlug": slug, "difficulty": "Easy", "topicTags": topics, "similarQuestions": "[]"},
+        "interaction_data": {
+            "solved": solved, "time_spent": 10.0, "attempts": 1, "hint_used": hint_used, "watched_youtube": False
+        },
+        "timestamp_logged": timestamp
+    }
+
+
+# two-sum is attempted twice in the same batch: failed with a hint, then solved without one
+REATTEMPT_BATCH = [
+    _interaction("two-sum", ["array", "hash-table"], False, True, "2025-08-20T10:00:00"),
+    _interaction("contains-duplicate", ["array"], True, False, "2025-08-20T11:00:00"),
+    _interaction("two-sum", ["array", "hash-table"], True, False, "2025-08-21T09:00:00"),
+]
+
+# TOPIC_STATS reflect only the latest interaction per question
+EXPECTED_TOPIC_STATS = {
+    "array": {"count": 2, "solved": 2, "hints_used": 0, "watched_youtube": 0},
+    "hash-table": {"count": 1, "solved": 1, "hints_used": 0, "watched_youtube": 0},
+}
+
+
+def _attempted(topic_stats: dict) -> dict:
+    return {topic: stats for topic, stats in topic_stats.items() if stats["count"] > 0}
+
+
+def _rows(interactions: list) -> list:
+    return [
+        _interaction_row(i["question_data"], i["interaction_data"], i["timestamp_logged"])
+        for i in interactions
+    ]
+
+
+def test_latest_rows_keeps_the_last_row_per_question():
+    latest = _latest_rows(_rows(REATTEMPT_BATCH))
+
+    assert [row["title_slug"] for row in latest] == ["two-sum", "contains-duplicate"]
+    assert latest[0]["solved"] is True and latest[0]["hint_used"] is False
+
+
+def test_sqlite_reattempt_in_one_batch():
+    store = SQLiteGraphStore(":memory:")
+    store.log_interactions_batch("user_reattempt", REATTEMPT_BATCH)
+
+    assert _attempted(store.get_topic_performance_stats("user_reattempt")) == EXPECTED_TOPIC_STATS
+    # Every attempt is still kept as an event
+    assert store.get_topic_stats_between("user_reattempt", "2025-08-20", "2025-08-22")["array"]["count"] == 3
+
+
+@pytest.mark.skipif(not os.getenv("NEO4J_URI"), reason="needs a Neo4j server (NEO4J_URI)")
+def test_neo4j_reattempt_across_batches():
+    from graph_store import Neo4jGraphStore
+
+    store = Neo4jGraphStore()
+    user_id = f"test_reattempt_{uuid.uuid4().hex[:8]}"
+    try:
+        # Failed with a hint, then solved without one the next day
+        store.log_interactions_batch(user_id, REATTEMPT_BATCH[:1])
+        store.log_interactions_batch(user_id, REATTEMPT_BATCH[2:])
+
+        # TOPIC_STATS reflect only the latest interaction
+        assert _attempted(store.get_topic_performance_stats(user_id)) == {
+            "array": {"count": 1, "solved": 1, "hints_used": 0, "watched_youtube": 0},
+            "hash-table": {"count": 1, "solved": 1, "hints_used": 0, "watched_youtube": 0},
+        }
+        # while every attempt is kept in the daily rollups
+        assert store.get_topic_stats_between(user_id, "2025-08-20", "2025-08-22")["array"] == {
+            "count": 2, "solved": 1, "hints_used": 1, "watched_youtube": 0
+        }
+    finally:
+        store.delete_users([user_id])
+
+
+@pytest.mark.skipif(not os.getenv("NEO4J_URI"), reason="needs a Neo4j server (NEO4J_URI)")
+def test_neo4j_reattempt_in_one_batch():
+    from graph_store import Neo4jGraphStore
+
+    store = Neo4jGraphStore()
+    user_id = f"test_reattempt_{uuid.uuid4().hex[:8]}"
+    try:
+        store.log_interactions_batch(user_id, REATTEMPT_BATCH)
+        assert _attempted(store.get_topic_performance_stats(user_id)) == EXPECTED_TOPIC_STATS
+        assert store.get_topic_stats_between(user_id, "2025-08-20", "2025-08-22")["array"]["count"] == 3
+    finally:
+        store.delete_users([user_id])
@@ -0,0 +1,369 @@
+import argparse
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+
+TRACING = os.getenv("TRACING", "true").lower() == "true"
+# Finished traces are appended here as JSON lines when set; off by default, the in-process metrics are always kept
+TRACE_PATH = os.getenv("TRACE_PATH", "")
+# Once the file passes this size it is rotated to "<path>.1", replacing the previous one
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", 64 * 1024 * 1024))
+# Prometheus histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+@dataclass
+class Span:
+    kind: str                # "http", "cypher", "knowledge", "crew", "crew.task", ...
+    name: str
+    trace_id: str = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: str = None
+    start: float = field(default_factory=time.time)
+    seconds: float = 0.0
+    attrs: dict = field(default_factory=dict)
+    error: str = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """Every span recorded under one root span, e.g. one "Recommend" click."""
+
+    def __init__(self, name: str, trace_id: str = None):
+        self.name = name
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+    def breakdown(self) -> list:
+        """Spans in start order with their nesting depth, for display."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        depth = {}
+        rows = []
+        for span in spans:
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            rows.append({
+                "span": "  " * depth[span.span_id] + f"{span.kind}: {span.name}",
+                "ms": round(span.seconds * 1000, 1),
+                "start_ms": round((span.start - spans[0].start) * 1000, 1),
+                **({"error": span.error} if span.error else {}),
+                **span.attrs
+            })
+        return rows
+
+
+    def totals(self) -> dict:
+        """Seconds per span kind, counting only spans not nested in a span of the same kind."""
+        with self._lock:
+            spans = list(self.spans)
+        by_id = {span.span_id: span for span in spans}
+        totals = {}
+        for span in spans:
+            parent = by_id.get(span.parent_id)
+            while parent is not None and parent.kind != span.kind:
+                parent = by_id.get(parent.parent_id)
+            if parent is None:
+                totals[span.kind] = totals.get(span.kind, 0.0) + span.seconds
+        return {kind: round(seconds, 4) for kind, seconds in sorted(totals.items(), key=lambda kv: -kv[1])}
+
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "trace_id": self.trace_id,
+                "name": self.name,
+                "spans": [asdict(span) for span in sorted(self.spans, key=lambda s: s.start)]
+            }
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """Process-wide span latency histograms and counters, renderable in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}    # (kind, name) -> {"count", "sum", "errors", "buckets"}
+        self._counters = {}      # (metric, sorted label items) -> value
+        self._lock = threading.Lock()
+
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.setdefault(
+                (kind, name), {"count": 0, "sum": 0.0, "errors": 0, "buckets": [0] * len(self.buckets)}
+            )
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["errors"] += int(error)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["buckets"][i] += 1
+
+
+    def inc(self, metric: str, value: float = 1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+
+    def observe_span(self, span: dict):
+        """Feed a span (as recorded in the JSONL file) into the histograms and token counters."""
+        self.observe(span["kind"], span["name"], span["seconds"], error=bool(span.get("error")))
+        for attr in ("prompt_tokens", "completion_tokens"):
+            if span["attrs"].get(attr):
+                self.inc(f"leetcrew_llm_{attr}_total", span["attrs"][attr], agent=span["name"])
+
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                f"{kind}:{name}": {
+                    "count": h["count"],
+                    "errors": h["errors"],
+                    "mean_ms": round(h["sum"] / h["count"] * 1000, 3)
+                }
+                for (kind, name), h in sorted(self._histograms.items())
+            }
+
+
+    def prometheus(self) -> str:
+        lines = [
+            "# HELP leetcrew_span_seconds Latency of traced HTTP calls, Cypher statements, knowledge writes and crew tasks.",
+            "# TYPE leetcrew_span_seconds histogram"
+        ]
+        with self._lock:
+            for (kind, name), h in sorted(self._histograms.items()):
+                labels = {"kind": kind, "name": name}
+                for bound, count in zip(self.buckets, h["buckets"]):
+                    lines.append(f"leetcrew_span_seconds_bucket{_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"leetcrew_span_seconds_bucket{_labels({**labels, 'le': '+Inf'})} {h['count']}")
+                lines.append(f"leetcrew_span_seconds_sum{_labels(labels)} {h['sum']:.6f}")
+                lines.append(f"leetcrew_span_seconds_count{_labels(labels)} {h['count']}")
+
+            lines.append("# HELP leetcrew_span_errors_total Traced spans that raised.")
+            lines.append("# TYPE leetcrew_span_errors_total counter")
+            for (kind, name), h in sorted(self._histograms.items()):
+                lines.append(f"leetcrew_span_errors_total{_labels({'kind': kind, 'name': name})} {h['errors']}")
+
+            for metric in sorted({metric for metric, _ in self._counters}):
+                lines.append(f"# TYPE {metric} counter")
+                for (name, labels), value in sorted(self._counters.items()):
+                    if name == metric:
+                        lines.append(f"{metric}{_labels(dict(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def result_counts(result) -> dict:
+    """
+    Result sizes worth attaching to a span: records returned and, for Cypher writes,
+    the non-zero update counters.
+    """
+    counts = {}
+    summary = getattr(result, "summary", None) if hasattr(result, "records") else result
+    if hasattr(result, "records"):
+        counts["records"] = len(result.records)
+    elif isinstance(result, (list, tuple, dict, set)) or hasattr(result, "shape"):
+        counts["records"] = len(result)
+
+    counters = getattr(summary, "counters", None)
+    if counters is not None:
+        for name in ("nodes_created", "nodes_deleted", "relationships_created",
+                     "relationships_deleted", "properties_set"):
+            if getattr(counters, name, 0):
+                counts[name] = getattr(counters, name)
+    return counts
+
+
+class Tracer:
+    """
+    Lightweight span timer. Spans nest through contextvars; every finished span feeds `metrics`,
+    and spans under a `trace()` are collected on it and, if `path` is set, written to it as one JSON line.
+
+    Args:
+        path (str): JSONL file finished traces are appended to; None or "" disables the file.
+        enabled (bool): When False, spans are still yielded but nothing is timed or recorded.
+        max_bytes (int): Size at which the file is rotated to "<path>.1"; None never rotates.
+    """
+
+    def __init__(self, path: str = TRACE_PATH, enabled: bool = TRACING, max_bytes: int = TRACE_MAX_BYTES):
+        self.path = path
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.metrics = Metrics()
+        self._write_lock = threading.Lock()
+
+
+    @contextmanager
+    def trace(self, name: str, **attrs):
+        """Start a new trace with a root span of kind "request"; yields the `Trace`."""
+        trace = Trace(name)
+        token = _current_trace.set(trace)
+        try:
+            with self.span("request", name, _parent=None, **attrs):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+            if self.enabled and self.path:
+                self._write(trace)
+
+
+    @contextmanager
+    def span(self, kind: str, name: str, _parent=..., **attrs):
+        """Time the block as a span; set result sizes on the yielded span with `span.set(...)`."""
+        trace = _current_trace.get()
+        parent = _current_span.get() if _parent is ... else _parent
+        span = Span(
+            kind, name,
+            trace_id=trace.trace_id if trace else None,
+            parent_id=parent.span_id if parent else None,
+            attrs=attrs
+        )
+        if not self.enabled:
+            yield span
+            return
+
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.seconds = time.perf_counter() - started
+            _current_span.reset(token)
+            self.metrics.observe(kind, name, span.seconds, error=span.error is not None)
+            if trace is not None:
+                trace.add(span)
+
+
+    def record(self, kind: str, name: str, seconds: float, **attrs):
+        """Add a span that was timed elsewhere (e.g. by a callback), ending now."""
+        if not self.enabled:
+            return
+        trace = _current_trace.get()
+        parent = _current_span.get()
+        span = Span(
+            kind, name,
+            trace_id=trace.trace_id if trace else None,
+            parent_id=parent.span_id if parent else None,
+            start=time.time() - seconds,
+            seconds=seconds,
+            attrs=attrs
+        )
+        self.metrics.observe_span(asdict(span))
+        if trace is not None:
+            trace.add(span)
+
+
+    def traced(self, kind: str, name: str = None, counts: bool = True):
+        """Decorator timing every call as a span, with `result_counts` of the return value attached if `counts`."""
+        def decorator(fn):
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(kind, span_name) as span:
+                    result = fn(*args, **kwargs)
+                    if counts:
+                        span.set(**result_counts(result))
+                    return result
+            return wrapper
+        return decorator
+
+
+    def current_trace(self):
+        return _current_trace.get()
+
+
+    @staticmethod
+    def wrap(fn):
+        """Bind fn to the current span, so work submitted to a thread pool nests under it."""
+        context = contextvars.copy_context()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # A context can only be entered by one thread at a time
+            return context.copy().run(fn, *args, **kwargs)
+        return wrapper
+
+
+    def _write(self, trace: Trace):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._write_lock:
+            if self.max_bytes is not None and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def load_traces(path: str = TRACE_PATH) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def metrics_from_traces(traces: list) -> Metrics:
+    """Rebuild metrics from recorded traces, e.g. those written by several app or batch processes."""
+    metrics = Metrics()
+    for trace in traces:
+        for span in trace["spans"]:
+            metrics.observe_span(span)
+    return metrics
+
+
+# Global, reusable tracer
+tracer = Tracer()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise recorded traces")
+    parser.add_argument("command", choices=["summary", "prometheus"])
+    parser.add_argument("--path", default=TRACE_PATH, help="JSONL trace file (defaults to TRACE_PATH)")
+    args = parser.parse_args()
+
+    if not args.path:
+        parser.exit(1, "No trace file: set TRACE_PATH to record traces (and read them here), or pass --path.\n")
+    if not os.path.exists(args.path):
+        parser.exit(1, f"No traces recorded at {args.path} yet; the app and batch job write them while TRACE_PATH is set.\n")
+
+    metrics = metrics_from_traces(load_traces(args.path))
+    if args.command == "prometheus":
+        print(metrics.prometheus(), end="")
+    else:
+        for span, stats in sorted(metrics.snapshot().items(), key=lambda kv: -kv[1]["mean_ms"] * kv[1]["count"]):
+            print(f"{span:60} n={stats['count']:<6} mean={stats['mean_ms']:.1f}ms errors={stats['errors']}")
@@ -1,47 +1,50 @@
 import os
 import requests
-from db import driver
+from db import connection_manager
 import datetime
 import json
 import pandas as pd
+from leetcode_api import LEETCODE_API, client
+from agentic.models import UserProfile
+from catalog import DIFFICULTIES, QUESTIONS_PATH, get_catalog
+from tracing import tracer
 
 
-# LEETCODE_API = "https://alfa-leetcode-api.onrender.com" # replace with local host
-LEETCODE_API = "http://localhost:3000" 
-
+@tracer.traced("http")
 def fetch_question_details(question):
-    """Fetch a LeetCode question and its metadata from the hosted API."""
-    url = f"{LEETCODE_API}/select?titleSlug={question}"
+    """Fetch a LeetCode question and its metadata from the hosted API (cached by slug)."""
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return data 
+        return client.question(question)
     except requests.RequestException as e:
         print(f"Error fetching problems: {e}")
         return None
 
 
+@tracer.traced("http")
 def fetch_all_questions(limit):
     """Fetch LeetCode questions and its metadata from the hosted API."""
-    url = f"{LEETCODE_API}/problems?limit={limit}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return data 
+        return client.problems(limit)
     except requests.RequestException as e:
         print(f"Error fetching problems: {e}")
         return None
     
 
+def chunked(items: list, size: int):
+    """Yield successive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 def get_all_topics(df):
     return list(df.columns[4:])
 
 
-def get_topic_performance_stats(user_id: str, df: pd.DataFrame = pd.read_csv("data/questions.csv")) -> dict:
+@tracer.traced("cypher")
+def get_topic_performance_stats(user_id: str, df: pd.DataFrame = None) -> dict:
     """
-    Fetches raw interaction statistics for each topic attempted by the user.
+    Fetches raw interaction statistics for each topic attempted by the user, read from the
+    per-user TOPIC_STATS aggregates that LeetCodeLogger maintains on every write.
 
     Args:
         user_id (str): The unique identifier of the user.
@@ -65,33 +68,30 @@ def get_topic_performance_stats(user_id: str, df: pd.DataFrame = pd.read_csv("da
     }
     """
     query = """
-    MATCH (u:User {user_id: $user_id})-[i:INTERACTED_WITH]->(q:Question)-[:HAS_TOPIC]->(t:Topic)
+    MATCH (u:User {user_id: $user_id})-[s:TOPIC_STATS]->(t:Topic)
+    WHERE s.count > 0
     RETURN 
       t.name AS topic,
-      COUNT(q) AS count,
-      SUM(CASE WHEN i.solved = true THEN 1 ELSE 0 END) AS solved,
-      SUM(CASE WHEN i.hint_used = true THEN 1 ELSE 0 END) AS hints_used,
-      SUM(CASE WHEN i.watched_youtube = true THEN 1 ELSE 0 END) AS watched_youtube
+      s.count AS count,
+      s.solved AS solved,
+      s.hints_used AS hints_used,
+      s.watched_youtube AS watched_youtube
     ORDER BY count DESC
     """
     print(f"get topic performance stats user id: {user_id}")
     topic_stats = {}
-    try:
-        with driver.session() as session:
-            result = session.run(query, user_id=user_id)
-            topic_stats = {}
-            for record in result:
-                topic_name = record["topic"]
-                topic_stats[topic_name] = {
-                    "count": record["count"],
-                    "solved": record["solved"],
-                    "hints_used": record["hints_used"],
-                    "watched_youtube": record["watched_youtube"]
-                }
-    finally:
-        driver.close()
+    with connection_manager.session() as session:
+        result = session.run(query, user_id=user_id)
+        for record in result:
+            topic_name = record["topic"]
+            topic_stats[topic_name] = {
+                "count": record["count"],
+                "solved": record["solved"],
+                "hints_used": record["hints_used"],
+                "watched_youtube": record["watched_youtube"]
+            }
     
-    all_topics = get_all_topics(df)
+    all_topics = get_all_topics(df) if df is not None else get_catalog().topics
     for topic in all_topics:
         if topic not in topic_stats:
             topic_stats[topic] = {
@@ -160,30 +160,70 @@ def analyse_topic_performance(performance_stats: dict) -> dict:
     return analyzed_performance
 
 
-def get_recently_solved(user_id: str) -> dict:
-    query = """
-    MATCH (u:User {id: $user_id})-[i:INTERACTED_WITH]->(q:Question)-[:HAS_TOPIC]->(t:Topic)
-    WHERE i.solved = true
-    WITH q, i, collect(t.name) AS topics
-    ORDER BY i.date_logged DESC
-    LIMIT 4
-    RETURN q.question_id AS id,
-           q.difficulty AS difficulty,
-           topics,
-           i.date_logged AS date_logged
+# How many of the most recently solved questions the strategy selector sees
+RECENTLY_SOLVED_COUNT = 4
+# Newest solved attempts read first when picking them; the scan widens 4x at a time while
+# re-solves of the same questions leave fewer than RECENTLY_SOLVED_COUNT distinct ones
+RECENT_ATTEMPTS_SCANNED = 50
+
+# Walks the (user_id, date_logged) index newest first instead of sorting the full history.
+# `scanned` tells the caller whether older attempts are left to widen the scan into.
+RECENTLY_SOLVED_QUERY = """
+MATCH (a:Attempt)
+WHERE a.user_id = $user_id AND a.date_logged IS NOT NULL AND a.solved = true
+WITH a
+ORDER BY a.date_logged DESC
+LIMIT $scan
+WITH collect(a) AS attempts
+CALL {
+    WITH attempts
+    UNWIND attempts AS a
+    WITH a.question_id AS question_id, max(a.date_logged) AS date_logged
+    ORDER BY date_logged DESC
+    LIMIT $count
+    MATCH (q:Question {question_id: question_id})
+    OPTIONAL MATCH (q)-[:HAS_TOPIC]->(t:Topic)
+    WITH q, date_logged, collect(t.name) AS topics
+    ORDER BY date_logged DESC
+    RETURN collect({id: q.question_id, difficulty: q.difficulty,
+                    topics: topics, date_logged: date_logged}) AS recently_solved
+}
+RETURN recently_solved, size(attempts) AS scanned
+"""
+
+
+def _read_recently_solved(tx, user_id: str, record=None, scan: int = RECENT_ATTEMPTS_SCANNED) -> list:
     """
+    The user's RECENTLY_SOLVED_COUNT most recently solved questions, newest first.
 
+    Widens the scan 4x while it came back full but with fewer distinct questions than wanted,
+    so users who re-solve the same questions still get RECENTLY_SOLVED_COUNT of them when
+    their history has that many. `record` is a first read already made with `scan`.
+    """
+    while True:
+        if record is None:
+            record = tx.run(
+                RECENTLY_SOLVED_QUERY, user_id=user_id, scan=scan, count=RECENTLY_SOLVED_COUNT
+            ).single()
+        if len(record["recently_solved"]) >= RECENTLY_SOLVED_COUNT or record["scanned"] < scan:
+            return record["recently_solved"]
+        scan *= 4
+        record = None
+
+
+@tracer.traced("cypher")
+def get_recently_solved(user_id: str) -> dict:
     try:
-        with driver.session() as session:
-            result = session.run(query, user_id=user_id)
+        with connection_manager.session() as session:
+            rows = session.execute_read(_read_recently_solved, user_id)
             recently_solved = {}
 
-            for record in result:
-                question_id = record["question_id"]
+            for row in rows:
+                question_id = row["id"]
                 recently_solved[question_id] = {
-                    "difficulty": record["difficulty"],
-                    "topics": record["topics"],
-                    "date_logged": record["date_logged"]
+                    "difficulty": row["difficulty"],
+                    "topics": row["topics"],
+                    "date_logged": row["date_logged"]
                 }
 
             return recently_solved
@@ -192,47 +232,264 @@ def get_recently_solved(user_id: str) -> dict:
         print(f"Error retrieving recently solved questions: {e}")
 
 
+def _iso_day(value) -> str:
+    """ISO date string for a date, datetime or already formatted day."""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, datetime.date) else str(value)
+
+
+@tracer.traced("cypher")
+def get_topic_stats_between(user_id: str, start, end=None) -> dict:
+    """
+    Sums the user's daily per-topic rollups over a time window, without touching raw events.
+
+    Args:
+        user_id (str): The unique identifier of the user.
+        start (datetime.date | str): First day of the window (inclusive).
+        end (datetime.date | str): Day the window ends (exclusive). Defaults to tomorrow.
+
+    Returns:
+        dict: Topic name to count/solved/hints_used/watched_youtube over the window, counting
+            every attempt (re-attempts included), in the shape of `get_topic_performance_stats`.
+            Pass it to `analyse_topic_performance` for e.g. accuracy over the last 30 days.
+    """
+    query = """
+    MATCH (d:TopicRollup)
+    WHERE d.user_id = $user_id AND d.day >= date($start) AND d.day < date($end) AND d.topic IS NOT NULL
+    RETURN d.topic AS topic,
+           SUM(d.count) AS count,
+           SUM(d.solved) AS solved,
+           SUM(d.hints_used) AS hints_used,
+           SUM(d.watched_youtube) AS watched_youtube
+    ORDER BY count DESC
+    """
+    if end is None:
+        end = datetime.date.today() + datetime.timedelta(days=1)
+
+    with connection_manager.session() as session:
+        result = session.run(query, user_id=user_id, start=_iso_day(start), end=_iso_day(end))
+        return {
+            record["topic"]: {
+                "count": record["count"],
+                "solved": record["solved"],
+                "hints_used": record["hints_used"],
+                "watched_youtube": record["watched_youtube"]
+            }
+            for record in result
+        }
+
+
+@tracer.traced("cypher")
 def get_difficulty_stats(user_id: str) -> dict:
     query = """
-    MATCH (u:User {id: $user_id})-[i:INTERACTED_WITH]->(q:Question)
+    MATCH (u:User {user_id: $user_id})-[i:INTERACTED_WITH]->(q:Question)
     WITH q.difficulty AS difficulty,
         COUNT(i) AS attempted,
         SUM(CASE WHEN i.solved = true THEN 1 ELSE 0 END) AS solved
     RETURN difficulty, attempted, solved
     """
 
-    try:
-        with driver.session() as session:
-            result = session.run(query, user_id=user_id)
-            difficulty_stats = {}
-            for record in result:
-                level = record["difficulty"]
-                difficulty_stats[level] = {
-                    "count": record["attempted"],
-                    "solved": record["sovlved"]
-                }
-            return difficulty_stats
-    finally:
-        driver.close()
+    with connection_manager.session() as session:
+        result = session.run(query, user_id=user_id)
+        difficulty_stats = {}
+        for record in result:
+            level = record["difficulty"]
+            difficulty_stats[level] = {
+                "count": record["attempted"],
+                "solved": record["solved"]
+            }
+        return difficulty_stats
 
 
+@tracer.traced("cypher")
 def get_unsolved_questions(user_id: str) -> dict:
     query = """
     MATCH (u: User {user_id: $user_id})-[i:INTERACTED_WITH]->(q:Question)
     WHERE i.solved = true
     RETURN q.question_id AS question_id
     """
-    all_questions = pd.read_csv("data\questions.csv")
-    try:
-        with driver.session() as session:
-            result = session.run(query, user_id=user_id)
-            solved = list(map(lambda x: x["question_id"], result))
-            unsolved = all_questions[~all_questions['title'].isin(solved)]
-            return unsolved
-    finally:
-        driver.close()
+    with connection_manager.session() as session:
+        result = session.run(query, user_id=user_id)
+        solved = list(map(lambda x: x["question_id"], result))
+
+    catalog = get_catalog()
+    return catalog.to_frame(catalog.select(exclude=solved))
+
+
+# Unsolved questions sharing the most of the given topics, as an anti-join inside the graph:
+# topics are found through the Topic name constraint and the user through the user_id constraint
+UNSOLVED_CANDIDATES_QUERY = """
+MATCH (t:Topic)
+WHERE t.name IN $topics
+MATCH (q:Question)-[:HAS_TOPIC]->(t)
+WHERE q.difficulty IN $difficulties
+  AND NOT EXISTS {
+      MATCH (:User {user_id: $user_id})-[i:INTERACTED_WITH]->(q)
+      WHERE i.solved = true
+  }
+WITH q, count(t) AS overlap
+ORDER BY overlap DESC, q.frontend_id ASC, q.question_id ASC
+SKIP $skip
+LIMIT $limit
+RETURN q.question_id AS slug, q.difficulty AS difficulty, overlap,
+       [(q)-[:HAS_TOPIC]->(topic:Topic) | topic.name] AS topics
+"""
+
+
+@tracer.traced("cypher")
+def get_unsolved_candidates(user_id: str, topics: list, max_difficulty: str = None,
+                            limit: int = 20, skip: int = 0) -> list:
+    """
+    One page of the user's unsolved questions that share the most of the given topics, queried
+    in the graph instead of against the in-memory catalog. Needs the catalog loaded into Neo4j
+    (`python3 catalog_loader.py`).
+
+    Args:
+        user_id (str): The unique identifier of the user.
+        topics (list): Topic slugs to match.
+        max_difficulty (str): Hardest difficulty to include, e.g. "Medium". Defaults to no limit.
+        limit (int): Page size.
+        skip (int): Candidates to skip, i.e. page * limit.
+
+    Returns:
+        list: Dicts with slug, topics, difficulty and overlap (shared topics), highest overlap
+            first and ties in catalog order.
+    """
+    difficulties = DIFFICULTIES if max_difficulty is None else DIFFICULTIES[:DIFFICULTIES.index(max_difficulty) + 1]
+    with connection_manager.session() as session:
+        result = session.run(
+            UNSOLVED_CANDIDATES_QUERY,
+            user_id=user_id, topics=list(topics), difficulties=difficulties, skip=skip, limit=limit
+        )
+        return [record.data() for record in result]
             
 
+USER_PROFILE_QUERY = """
+OPTIONAL MATCH (u:User {user_id: $user_id})
+
+CALL {
+    WITH u
+    MATCH (u)-[s:TOPIC_STATS]->(t:Topic)
+    WHERE s.count > 0
+    RETURN collect({topic: t.name, count: s.count, solved: s.solved,
+                    hints_used: s.hints_used, watched_youtube: s.watched_youtube}) AS topic_stats
+}
+
+CALL {
+    WITH u
+    MATCH (u)-[i:INTERACTED_WITH]->(q:Question)
+    RETURN collect({question: q, interaction: i}) AS interactions
+}
+
+CALL {
+    WITH interactions
+    UNWIND interactions AS row
+    WITH row.question.difficulty AS difficulty,
+         COUNT(row) AS attempted,
+         SUM(CASE WHEN row.interaction.solved = true THEN 1 ELSE 0 END) AS solved
+    RETURN collect({difficulty: difficulty, count: attempted, solved: solved}) AS difficulty_stats
+}
+
+CALL {
+    MATCH (a:Attempt)
+    WHERE a.user_id = $user_id AND a.date_logged IS NOT NULL AND a.solved = true
+    WITH a
+    ORDER BY a.date_logged DESC
+    LIMIT $scan
+    WITH collect(a) AS attempts
+    CALL {
+        WITH attempts
+        UNWIND attempts AS a
+        WITH a.question_id AS question_id, max(a.date_logged) AS date_logged
+        ORDER BY date_logged DESC
+        LIMIT $count
+        MATCH (q:Question {question_id: question_id})
+        OPTIONAL MATCH (q)-[:HAS_TOPIC]->(t:Topic)
+        WITH q, date_logged, collect(t.name) AS topics
+        ORDER BY date_logged DESC
+        RETURN collect({id: q.question_id, difficulty: q.difficulty,
+                        topics: topics, date_logged: date_logged}) AS recently_solved
+    }
+    RETURN recently_solved, size(attempts) AS scanned
+}
+
+CALL {
+    WITH interactions
+    UNWIND interactions AS row
+    WITH row
+    WHERE row.interaction.solved = true
+    RETURN collect(row.question.question_id) AS solved
+}
+
+RETURN topic_stats, difficulty_stats, recently_solved, scanned, solved
+"""
+
+
+@tracer.traced("cypher")
+def get_user_profile(user_id: str) -> UserProfile:
+    """
+    Fetches the topic stats, difficulty stats, recent solves and solved set of a user
+    in a single read transaction.
+
+    Topic stats come from the user's TOPIC_STATS aggregates and recent solves from the
+    indexed Attempt events; the user's interactions are traversed once for the other views.
+    Each view is a `CALL {}` subquery, so the snapshot costs one round trip.
+
+    Args:
+        user_id (str): The unique identifier of the user.
+
+    Returns:
+        UserProfile: `topic_stats` and `difficulty_stats` have the same shape as
+            `get_topic_performance_stats` and `get_difficulty_stats`, `recently_solved` as
+            `get_recently_solved` (with ISO timestamps), and `solved` lists solved question ids.
+    """
+    def read_profile(tx):
+        record = tx.run(
+            USER_PROFILE_QUERY, user_id=user_id, scan=RECENT_ATTEMPTS_SCANNED, count=RECENTLY_SOLVED_COUNT
+        ).single()
+        # Rarely needed: only when re-solves crowd the first scan
+        return record, _read_recently_solved(tx, user_id, record)
+
+    with connection_manager.session() as session:
+        record, recent = session.execute_read(read_profile)
+
+    topic_stats = {
+        row["topic"]: {
+            "count": row["count"],
+            "solved": row["solved"],
+            "hints_used": row["hints_used"],
+            "watched_youtube": row["watched_youtube"]
+        }
+        for row in record["topic_stats"]
+    }
+    for topic in get_catalog().topics:
+        topic_stats.setdefault(topic, {"count": 0, "solved": 0, "hints_used": 0, "watched_youtube": 0})
+
+    difficulty_stats = {
+        row["difficulty"]: {"count": row["count"], "solved": row["solved"]}
+        for row in record["difficulty_stats"]
+        if row["difficulty"] is not None
+    }
+
+    recently_solved = {
+        row["id"]: {
+            "difficulty": row["difficulty"],
+            "topics": row["topics"],
+            "date_logged": row["date_logged"].iso_format() if row["date_logged"] is not None else None
+        }
+        for row in recent
+    }
+
+    return UserProfile(
+        user_id=user_id,
+        topic_stats=topic_stats,
+        difficulty_stats=difficulty_stats,
+        recently_solved=recently_solved,
+        solved=sorted(record["solved"])
+    )
+
+
 def serialize_datetime(obj):
     """Serialize datetime objects"""
     if isinstance(obj, datetime.datetime):
@@ -241,6 +498,13 @@ def serialize_datetime(obj):
 
 
 def save_knowledge(user_id: str, data: dict, filename: str, filetype: str):
+    with tracer.span("knowledge", f"{filename}.{filetype.lower()}", user_id=user_id) as span:
+        path = _write_knowledge(user_id, data, filename, filetype)
+        span.set(bytes=os.path.getsize(path))
+        return path
+
+
+def _write_knowledge(user_id: str, data: dict, filename: str, filetype: str):
     os.makedirs("knowledge", exist_ok=True)
     path = os.path.join(os.getcwd(), f"knowledge/{user_id}_{filename}.{filetype.lower()}")
 